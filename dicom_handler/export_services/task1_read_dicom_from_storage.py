@@ -145,6 +145,12 @@ def process_single_file(file_info):
                         "series_description": series_description
                     }
             
+            # Instance number is stored as an integer; malformed values are dropped
+            try:
+                instance_number = int(getattr(dicom_data, 'InstanceNumber', None))
+            except (TypeError, ValueError):
+                instance_number = None
+            
             # Extract DICOM metadata
             dicom_metadata = {
                 'patient_id': getattr(dicom_data, 'PatientID', ''),
@@ -164,6 +170,8 @@ def process_single_file(file_info):
                 'series_date': getattr(dicom_data, 'SeriesDate', None),
                 'frame_of_reference_uid': getattr(dicom_data, 'FrameOfReferenceUID', ''),
                 'sop_instance_uid': sop_instance_uid,
+                'sop_class_uid': getattr(dicom_data, 'SOPClassUID', ''),
+                'instance_number': instance_number,
                 'file_path': file_path,
                 'series_root_path': series_root_path
             }
@@ -292,6 +300,8 @@ def bulk_create_database_records(processed_files):
         instances_to_create.append({
             'series_key': series_key,
             'sop_instance_uid': metadata['sop_instance_uid'],
+            'sop_class_uid': metadata['sop_class_uid'],
+            'instance_number': metadata['instance_number'],
             'instance_path': metadata['file_path']
         })
     
@@ -373,6 +383,8 @@ def bulk_create_database_records(processed_files):
                     DICOMInstance(
                         series_instance_uid=series,
                         sop_instance_uid=instance_data['sop_instance_uid'],
+                        sop_class_uid=instance_data['sop_class_uid'],
+                        instance_number=instance_data['instance_number'],
                         instance_path=instance_data['instance_path']
                     )
                 )
@@ -502,11 +514,17 @@ def process_dicom_file(dicom_data, file_path, series_root_path):
             
             # Extract instance information
             sop_instance_uid = getattr(dicom_data, 'SOPInstanceUID', '')
+            try:
+                instance_number = int(getattr(dicom_data, 'InstanceNumber', None))
+            except (TypeError, ValueError):
+                instance_number = None
             
             # Create instance
             instance = DICOMInstance.objects.create(
                 series_instance_uid=series,
                 sop_instance_uid=sop_instance_uid,
+                sop_class_uid=getattr(dicom_data, 'SOPClassUID', ''),
+                instance_number=instance_number,
                 instance_path=file_path
             )
             
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.8 on 2026-10-18 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dicom_handler', '0054_systemconfiguration_exclude_localizer_series'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dicominstance',
+            name='sop_instance_uid',
+            field=models.CharField(blank=True, db_index=True, max_length=256, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dicomseries',
+            name='series_instance_uid',
+            field=models.CharField(blank=True, db_index=True, max_length=256, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dicomstudy',
+            name='study_instance_uid',
+            field=models.CharField(blank=True, db_index=True, max_length=256, null=True),
+        ),
+    ]
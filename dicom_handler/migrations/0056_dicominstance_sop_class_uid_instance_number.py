@@ -0,0 +1,23 @@
+# Generated by Django 6.0.8 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dicom_handler', '0055_uid_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dicominstance',
+            name='instance_number',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dicominstance',
+            name='sop_class_uid',
+            field=models.CharField(blank=True, max_length=256, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.8 on 2026-10-18 11:02
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dicom_handler', '0056_dicominstance_sop_class_uid_instance_number'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dicomstudy',
+            index=models.Index(django.db.models.functions.text.Upper('accession_number'), name='dicomstudy_accession_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(django.db.models.functions.text.Upper('patient_id'), name='patient_patient_id_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(django.db.models.functions.text.Upper('patient_name'), name='patient_patient_name_upper_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -542,7 +543,12 @@ class Patient(models.Model):
     class Meta:
         verbose_name = "Patient"
         verbose_name_plural = "Patients"
-        ordering = ["-patient_date_of_birth"]    
+        ordering = ["-patient_date_of_birth"]
+        # C-FIND matches these case-insensitively (UPPER(column) = UPPER(value))
+        indexes = [
+            models.Index(Upper('patient_id'), name='patient_patient_id_upper_idx'),
+            models.Index(Upper('patient_name'), name='patient_patient_name_upper_idx'),
+        ]    
 
 class DICOMStudy(models.Model):
     '''
@@ -550,7 +556,7 @@ class DICOMStudy(models.Model):
     '''
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     patient = models.ForeignKey(Patient,on_delete=models.CASCADE)
-    study_instance_uid = models.CharField(max_length=256,null=True,blank=True)
+    study_instance_uid = models.CharField(max_length=256,null=True,blank=True,db_index=True)
     deidentified_study_instance_uid = models.CharField(max_length=256,null=True,blank=True)
     study_date = models.DateField(null=True,blank=True)
     deidentified_study_date = models.DateField(null=True,blank=True)
@@ -572,6 +578,10 @@ class DICOMStudy(models.Model):
         verbose_name = "DICOM Study"
         verbose_name_plural = "DICOM Studies"
         ordering = ["-study_date"]
+        # C-FIND matches AccessionNumber case-insensitively
+        indexes = [
+            models.Index(Upper('accession_number'), name='dicomstudy_accession_upper_idx'),
+        ]
 
 class ProcessingStatus(models.TextChoices):
     '''
@@ -597,7 +607,7 @@ class DICOMSeries(models.Model):
     '''
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     study = models.ForeignKey(DICOMStudy,on_delete=models.CASCADE)
-    series_instance_uid = models.CharField(max_length=256,null=True,blank=True)
+    series_instance_uid = models.CharField(max_length=256,null=True,blank=True,db_index=True)
     deidentified_series_instance_uid = models.CharField(max_length=256,null=True,blank=True)
     series_root_path = models.CharField(max_length=256,null=True,blank=True)
     frame_of_reference_uid = models.CharField(max_length=256,null=True,blank=True)
@@ -627,8 +637,10 @@ class DICOMInstance(models.Model):
     '''
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     series_instance_uid = models.ForeignKey(DICOMSeries,on_delete=models.CASCADE)
-    sop_instance_uid = models.CharField(max_length=256,null=True,blank=True)
+    sop_instance_uid = models.CharField(max_length=256,null=True,blank=True,db_index=True)
     deidentified_sop_instance_uid = models.CharField(max_length=256,null=True,blank=True)
+    sop_class_uid = models.CharField(max_length=256,null=True,blank=True)
+    instance_number = models.IntegerField(null=True,blank=True)
     instance_path = models.CharField(max_length=256,null=True,blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
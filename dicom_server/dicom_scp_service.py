@@ -4,13 +4,20 @@ This module handles incoming DICOM connections and operations.
 """
 
 import os
+import ipaddress
 import logging
+import queue
+import socket
+import socketserver
 import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
-from pynetdicom import AE, evt, StoragePresentationContexts, AllStoragePresentationContexts
+from pynetdicom import AE, evt, StoragePresentationContexts, AllStoragePresentationContexts, DEFAULT_TRANSFER_SYNTAXES
+from pynetdicom.transport import AssociationServer
 from pynetdicom.sop_class import (
     Verification,
     CTImageStorage,
@@ -38,12 +45,170 @@ from pydicom.uid import (
 )
 
 from django.utils import timezone
-from django.db import transaction as db_transaction
+from django.db import close_old_connections, transaction as db_transaction
+from django.db.models import F, Case, When, Value, DateTimeField
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 
 from .models import DicomServerConfig, RemoteDicomNode, DicomTransaction, DicomServiceStatus
 
 logger = logging.getLogger(__name__)
 
+# Non-storage abstract syntaxes; these keep default SCP/SCU roles for C-GET
+QR_AND_VERIFICATION_UIDS = frozenset({
+    PatientRootQueryRetrieveInformationModelFind,
+    StudyRootQueryRetrieveInformationModelFind,
+    PatientRootQueryRetrieveInformationModelMove,
+    StudyRootQueryRetrieveInformationModelMove,
+    PatientRootQueryRetrieveInformationModelGet,
+    StudyRootQueryRetrieveInformationModelGet,
+    Verification,
+})
+
+
+# In-process cache for the configuration singletons so that per-event code
+# paths (C-STORE, C-ECHO, validation) do not issue a SELECT for every call.
+# Entries expire after CONFIG_CACHE_TTL seconds and are dropped on save.
+CONFIG_CACHE_TTL = 5  # seconds
+
+# Connection counters are accumulated in memory and persisted with a single
+# UPDATE every STATS_FLUSH_INTERVAL seconds instead of one save per event.
+STATS_FLUSH_INTERVAL = 5  # seconds
+
+# Transaction log rows are queued in memory and sent to Celery in batches of
+# up to TRANSACTION_BATCH_SIZE rows, or whatever arrived within the window.
+TRANSACTION_BATCH_SIZE = 500
+TRANSACTION_BATCH_WINDOW = 0.25  # seconds
+
+# Post-store work runs on POST_STORE_WORKERS single-thread executors, one
+# chosen per calling AE title so each AE's series tracking stays in arrival
+# order. At most POST_STORE_MAX_PENDING items may be queued or running; when
+# the backlog is full the association thread waits for a free slot.
+POST_STORE_WORKERS = 4
+POST_STORE_MAX_PENDING = 64
+_config_cache = {}
+_config_cache_lock = threading.Lock()
+
+
+def _get_cached_singleton(model):
+    """
+    Return the pk=1 instance of a singleton configuration model, served from
+    the in-process cache while it is younger than CONFIG_CACHE_TTL.
+    """
+    now = time.monotonic()
+    with _config_cache_lock:
+        entry = _config_cache.get(model)
+        if entry is not None and now - entry[1] < CONFIG_CACHE_TTL:
+            return entry[0]
+    
+    obj = model.objects.get(pk=1)
+    with _config_cache_lock:
+        _config_cache[model] = (obj, now)
+    return obj
+
+
+def get_cached_server_config():
+    """
+    Get DicomServerConfig from the in-process cache (falls back to the DB).
+    """
+    return _get_cached_singleton(DicomServerConfig)
+
+
+def get_cached_system_config():
+    """
+    Get dicom_handler SystemConfiguration from the in-process cache (falls back to the DB).
+    """
+    from dicom_handler.models import SystemConfiguration
+    return _get_cached_singleton(SystemConfiguration)
+
+
+def clear_config_cache():
+    """
+    Drop all cached configuration objects.
+    """
+    with _config_cache_lock:
+        _config_cache.clear()
+
+
+@receiver(post_save, sender=DicomServerConfig)
+@receiver(post_save, sender='dicom_handler.SystemConfiguration')
+def invalidate_config_cache(sender, **kwargs):
+    """
+    Drop the cached configuration when it is saved so changes apply immediately.
+    """
+    with _config_cache_lock:
+        _config_cache.pop(sender, None)
+
+
+# Authorized incoming AE titles (title -> RemoteDicomNode id) with the time
+# they were loaded. The map is dropped on RemoteDicomNode changes in this
+# process and expires after CONFIG_CACHE_TTL seconds so that changes made in
+# other processes (e.g. other web workers) are picked up as well.
+_authorized_ae_titles = None
+_authorized_ae_lock = threading.Lock()
+
+
+def get_authorized_ae_titles():
+    """
+    Return a dict of incoming AE titles allowed to connect, mapped to node id.
+    """
+    global _authorized_ae_titles
+    now = time.monotonic()
+    with _authorized_ae_lock:
+        entry = _authorized_ae_titles
+        if entry is not None and now - entry[1] < CONFIG_CACHE_TTL:
+            return entry[0]
+        
+        titles = {}
+        nodes = RemoteDicomNode.objects.filter(
+            allow_incoming=True,
+            is_active=True
+        ).order_by('pk').values_list('incoming_ae_title', 'id')
+        for ae_title, node_id in nodes:
+            titles.setdefault(ae_title, node_id)
+        _authorized_ae_titles = (titles, now)
+        return titles
+
+
+@receiver(post_save, sender=RemoteDicomNode)
+@receiver(post_delete, sender=RemoteDicomNode)
+def invalidate_authorized_ae_titles(sender, **kwargs):
+    """
+    Drop the authorized AE title map so the next validation reloads it.
+    """
+    global _authorized_ae_titles
+    with _authorized_ae_lock:
+        _authorized_ae_titles = None
+
+
+class KeepAliveAssociationServer(AssociationServer):
+    """
+    Association server that tunes accepted sockets for long-lived associations.
+    
+    TCP_NODELAY avoids Nagle delays on the small DIMSE response PDUs, and
+    SO_KEEPALIVE keeps idle associations that SCUs reuse for many C-STOREs
+    from being dropped by intermediate firewalls.
+    """
+    
+    def get_request(self):
+        client_socket, address = super().get_request()
+        try:
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except OSError as e:
+            logger.debug("Could not set socket options for %s: %s", address, e)
+        return client_socket, address
+    
+    def shutdown(self):
+        """
+        Stop serving and close the listening socket.
+        The service owns this server rather than the AE, so unlike
+        AssociationServer.shutdown() it is not removed from the AE's servers.
+        """
+        socketserver.BaseServer.shutdown(self)
+        self.server_close()
+
 
 class DicomSCPService:
     """
@@ -51,28 +216,68 @@ class DicomSCPService:
     Handles all DICOM operations including C-STORE, C-ECHO, C-FIND, C-MOVE, C-GET.
     """
     
+    # Storage roots already created/verified during this process lifetime
+    _storage_verified = set()
+    
     def __init__(self):
         self.ae = None
         self.server_thread = None
+        self._server = None
         self._is_running = False
         self.config = None
+        self.storage_root = None
         self.service_status = None
         self._config_last_updated = None
+        self._allowed_networks = []
+        self._event_handlers = None  # (enabled services, handler list)
+        
+        # DIMSE operation implementations, bound in _bind_operation_handlers()
+        self._c_store_fn = None
+        self._c_find_fn = None
+        self._c_move_fn = None
+        self._c_get_fn = None
+        self._finalize_series_fn = None
+        
+        # Pending connection counter deltas (flushed by the stats thread)
+        self._stats_lock = threading.Lock()
+        self._pending_stats = Counter()
+        self._pending_last_connection_at = None
+        self._pending_incoming_nodes = {}
+        self._stats_thread = None
+        self._background_stop_event = threading.Event()
+        
+        # Pending transaction log rows (drained by the transaction thread)
+        self._txn_queue = queue.Queue()
+        self._txn_drain_thread = None
+        
+        # Workers for post-store work (handler folder copy, database
+        # registration, series finalization). Work for one AE title always goes
+        # to the same single-thread executor, which keeps its series tracking
+        # in arrival order while the association thread returns the C-STORE
+        # response without waiting on it.
+        self._post_store_executors = None
+        self._post_store_slots = threading.BoundedSemaphore(POST_STORE_MAX_PENDING)
         
     def initialize(self):
         """
         Initialize the DICOM SCP service with configuration from database.
         """
         try:
-            from dicom_handler.models import SystemConfiguration
-            
-            self.config = DicomServerConfig.objects.get(pk=1)
+            self.config = get_cached_server_config()
             self.service_status, created = DicomServiceStatus.objects.get_or_create(pk=1)
             
-            # Override storage path with SystemConfiguration folder_configuration
-            system_config = SystemConfiguration.objects.get(pk=1)
-            if system_config.folder_configuration:
-                self.config.storage_root_path = system_config.folder_configuration
+            # Storage root comes from SystemConfiguration folder_configuration.
+            # Kept on the service: the cached config objects are shared with
+            # every handler thread and must not be modified.
+            system_config = get_cached_system_config()
+            self.storage_root = system_config.folder_configuration
+            
+            # Parse allowed IP addresses/networks once
+            self._allowed_networks = self._parse_allowed_networks()
+            
+            # Load authorized incoming AE titles
+            invalidate_authorized_ae_titles(RemoteDicomNode)
+            get_authorized_ae_titles()
             
             # Set logging level
             log_level = getattr(logging, self.config.logging_level, logging.INFO)
@@ -81,11 +286,8 @@ class DicomSCPService:
             # Create Application Entity
             self.ae = AE(ae_title=self.config.ae_title)
             
-            # Configure supported SOP classes
-            self._configure_sop_classes()
-            
-            # Configure transfer syntaxes
-            self._configure_transfer_syntaxes()
+            # Configure supported SOP classes with the configured transfer syntaxes
+            self._configure_sop_classes(self._configure_transfer_syntaxes())
             
             # Set network parameters
             self.ae.maximum_pdu_size = self.config.max_pdu_size
@@ -119,12 +321,13 @@ class DicomSCPService:
         """
         try:
             # Check if config has been updated in database
-            latest_config = DicomServerConfig.objects.get(pk=1)
+            latest_config = DicomServerConfig.objects.get(pk=1) if force else get_cached_server_config()
             
             if force or (self._config_last_updated and latest_config.updated_at > self._config_last_updated):
                 logger.info("Configuration has been updated, refreshing...")
                 self.config = latest_config
                 self._config_last_updated = latest_config.updated_at
+                self._allowed_networks = self._parse_allowed_networks()
                 
                 # Update logging level
                 log_level = getattr(logging, self.config.logging_level, logging.INFO)
@@ -143,30 +346,65 @@ class DicomSCPService:
         """
         Get fresh configuration from database.
         Use this for critical settings that need to be always up-to-date.
+        Served from the in-process config cache, which is invalidated on save.
         
         Returns:
             DicomServerConfig: Fresh configuration object from database
         """
         try:
-            return DicomServerConfig.objects.get(pk=1)
+            return get_cached_server_config()
         except Exception as e:
             logger.error(f"Failed to get fresh config: {str(e)}")
             return self.config  # Fallback to cached config
     
-    def _configure_sop_classes(self):
+    def _configure_transfer_syntaxes(self):
+        """
+        Build the supported transfer syntaxes based on configuration.
+        
+        Returns:
+            tuple: Transfer syntax UIDs (pynetdicom defaults if none are enabled)
+        """
+        transfer_syntaxes = []
+        
+        if self.config.support_implicit_vr_little_endian:
+            transfer_syntaxes.append(ImplicitVRLittleEndian)
+        
+        if self.config.support_explicit_vr_little_endian:
+            transfer_syntaxes.append(ExplicitVRLittleEndian)
+        
+        if self.config.support_explicit_vr_big_endian:
+            transfer_syntaxes.append(ExplicitVRBigEndian)
+        
+        if self.config.support_jpeg_baseline:
+            transfer_syntaxes.append(JPEGBaseline)
+        
+        if self.config.support_jpeg_lossless:
+            transfer_syntaxes.append(JPEGLossless)
+        
+        if self.config.support_jpeg2000_lossless:
+            transfer_syntaxes.append(JPEG2000Lossless)
+        
+        if self.config.support_rle_lossless:
+            transfer_syntaxes.append(RLELossless)
+        
+        return tuple(transfer_syntaxes) or tuple(DEFAULT_TRANSFER_SYNTAXES)
+    
+    def _configure_sop_classes(self, transfer_syntaxes):
         """
         Configure supported SOP classes based on configuration.
+        Each context is created with the configured transfer syntaxes directly,
+        so no second pass over the supported contexts is needed.
         """
         # Verification SOP Class (C-ECHO)
         if self.config.enable_c_echo:
-            self.ae.add_supported_context(Verification)
+            self.ae.add_supported_context(Verification, transfer_syntaxes)
         
         # Storage SOP Classes - Add ALL storage contexts for C-GET/C-MOVE compatibility
         # This ensures the SCP can send back any type of DICOM file during retrieve operations
         if self.config.enable_c_get or self.config.enable_c_move:
             # Add all storage presentation contexts to support any DICOM file type
             for context in AllStoragePresentationContexts:
-                self.ae.add_supported_context(context.abstract_syntax)
+                self.ae.add_supported_context(context.abstract_syntax, transfer_syntaxes)
             
             # For C-GET: Enable SCP/SCU role negotiation on storage contexts
             # C-GET requires the server to act as Storage SCU to send files back
@@ -174,81 +412,41 @@ class DicomSCPService:
             if self.config.enable_c_get:
                 for cx in self.ae.supported_contexts:
                     # Only set roles for storage contexts, not QR contexts
-                    if cx.abstract_syntax not in [
-                        PatientRootQueryRetrieveInformationModelFind,
-                        StudyRootQueryRetrieveInformationModelFind,
-                        PatientRootQueryRetrieveInformationModelMove,
-                        StudyRootQueryRetrieveInformationModelMove,
-                        PatientRootQueryRetrieveInformationModelGet,
-                        StudyRootQueryRetrieveInformationModelGet,
-                        Verification
-                    ]:
+                    if cx.abstract_syntax not in QR_AND_VERIFICATION_UIDS:
                         cx.scp_role = True
                         cx.scu_role = False
         else:
             # If not using C-GET/C-MOVE, only add specific storage contexts based on config
             if self.config.support_ct_image_storage:
-                self.ae.add_supported_context(CTImageStorage)
+                self.ae.add_supported_context(CTImageStorage, transfer_syntaxes)
                 
             if self.config.support_mr_image_storage:
-                self.ae.add_supported_context(MRImageStorage)
+                self.ae.add_supported_context(MRImageStorage, transfer_syntaxes)
                 
             if self.config.support_rt_structure_storage:
-                self.ae.add_supported_context(RTStructureSetStorage)
+                self.ae.add_supported_context(RTStructureSetStorage, transfer_syntaxes)
                 
             if self.config.support_rt_plan_storage:
-                self.ae.add_supported_context(RTPlanStorage)
+                self.ae.add_supported_context(RTPlanStorage, transfer_syntaxes)
                 
             if self.config.support_rt_dose_storage:
-                self.ae.add_supported_context(RTDoseStorage)
+                self.ae.add_supported_context(RTDoseStorage, transfer_syntaxes)
                 
             if self.config.support_secondary_capture:
-                self.ae.add_supported_context(SecondaryCaptureImageStorage)
+                self.ae.add_supported_context(SecondaryCaptureImageStorage, transfer_syntaxes)
         
         # Query/Retrieve SOP Classes
         if self.config.enable_c_find:
-            self.ae.add_supported_context(PatientRootQueryRetrieveInformationModelFind)
-            self.ae.add_supported_context(StudyRootQueryRetrieveInformationModelFind)
+            self.ae.add_supported_context(PatientRootQueryRetrieveInformationModelFind, transfer_syntaxes)
+            self.ae.add_supported_context(StudyRootQueryRetrieveInformationModelFind, transfer_syntaxes)
         
         if self.config.enable_c_move:
-            self.ae.add_supported_context(PatientRootQueryRetrieveInformationModelMove)
-            self.ae.add_supported_context(StudyRootQueryRetrieveInformationModelMove)
+            self.ae.add_supported_context(PatientRootQueryRetrieveInformationModelMove, transfer_syntaxes)
+            self.ae.add_supported_context(StudyRootQueryRetrieveInformationModelMove, transfer_syntaxes)
         
         if self.config.enable_c_get:
-            self.ae.add_supported_context(PatientRootQueryRetrieveInformationModelGet)
-            self.ae.add_supported_context(StudyRootQueryRetrieveInformationModelGet)
-    
-    def _configure_transfer_syntaxes(self):
-        """
-        Configure supported transfer syntaxes based on configuration.
-        """
-        transfer_syntaxes = []
-        
-        if self.config.support_implicit_vr_little_endian:
-            transfer_syntaxes.append(ImplicitVRLittleEndian)
-        
-        if self.config.support_explicit_vr_little_endian:
-            transfer_syntaxes.append(ExplicitVRLittleEndian)
-        
-        if self.config.support_explicit_vr_big_endian:
-            transfer_syntaxes.append(ExplicitVRBigEndian)
-        
-        if self.config.support_jpeg_baseline:
-            transfer_syntaxes.append(JPEGBaseline)
-        
-        if self.config.support_jpeg_lossless:
-            transfer_syntaxes.append(JPEGLossless)
-        
-        if self.config.support_jpeg2000_lossless:
-            transfer_syntaxes.append(JPEG2000Lossless)
-        
-        if self.config.support_rle_lossless:
-            transfer_syntaxes.append(RLELossless)
-        
-        # Apply transfer syntaxes to all supported contexts
-        if transfer_syntaxes:
-            for context in self.ae.supported_contexts:
-                context.transfer_syntax = transfer_syntaxes
+            self.ae.add_supported_context(PatientRootQueryRetrieveInformationModelGet, transfer_syntaxes)
+            self.ae.add_supported_context(StudyRootQueryRetrieveInformationModelGet, transfer_syntaxes)
     
     def start(self):
         """
@@ -263,29 +461,69 @@ class DicomSCPService:
             return False
         
         try:
-            # Create storage directory if it doesn't exist
-            os.makedirs(self.config.storage_root_path, exist_ok=True)
+            # Create storage directory if it doesn't exist (once per process)
+            storage_root = self.storage_root
+            if storage_root and storage_root not in self._storage_verified:
+                os.makedirs(storage_root, exist_ok=True)
+                self._storage_verified.add(storage_root)
             
             # Set up event handlers
+            self._bind_operation_handlers()
             handlers = self._get_event_handlers()
             
+            # Equivalent to ae.start_server(block=False), but with socket tuning;
+            # the server is kept on the service and shut down in stop()
+            self._server = self.ae.make_server(
+                (self.config.host, self.config.port),
+                evt_handlers=handlers,
+                server_class=KeepAliveAssociationServer
+            )
+            
             # Start the server in a separate thread
             self.server_thread = threading.Thread(
                 target=self._run_server,
-                args=(handlers,),
+                args=(self._server,),
                 daemon=True
             )
             self.server_thread.start()
             
+            # Start the connection statistics flush thread
+            self._background_stop_event.clear()
+            self._stats_thread = threading.Thread(
+                target=self._run_stats_flush,
+                daemon=True
+            )
+            self._stats_thread.start()
+            
+            # Start the transaction log drain thread
+            self._txn_drain_thread = threading.Thread(
+                target=self._run_transaction_drain,
+                daemon=True
+            )
+            self._txn_drain_thread.start()
+            
+            self._post_store_executors = [
+                ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix=f'dicom-post-store-{i}'
+                )
+                for i in range(POST_STORE_WORKERS)
+            ]
+            
             # Update service status
             self._is_running = True
+            now = timezone.now()
             self.service_status.is_running = True
-            self.service_status.service_started_at = timezone.now()
+            self.service_status.service_started_at = now
             self.service_status.process_id = os.getpid()
-            self.service_status.save()
+            DicomServiceStatus.objects.filter(pk=self.service_status.pk).update(
+                is_running=True,
+                service_started_at=now,
+                process_id=self.service_status.process_id,
+                updated_at=now
+            )
             
             # Update config last_service_start without triggering updated_at
-            from django.db.models import F
             DicomServerConfig.objects.filter(pk=1).update(
                 last_service_start=timezone.now()
             )
@@ -309,7 +547,13 @@ class DicomSCPService:
         try:
             self._is_running = False
             
-            # Shutdown the AE
+            # Stop accepting associations, then abort any still active
+            if self._server:
+                if self.server_thread and self.server_thread.is_alive():
+                    self._server.shutdown()
+                else:
+                    self._server.server_close()
+                self._server = None
             if self.ae:
                 self.ae.shutdown()
             
@@ -317,15 +561,44 @@ class DicomSCPService:
             if self.server_thread and self.server_thread.is_alive():
                 self.server_thread.join(timeout=5)
             
-            # Update service status
+            # Stop the stats thread and persist any remaining counter deltas
+            self._background_stop_event.set()
+            if self._stats_thread and self._stats_thread.is_alive():
+                self._stats_thread.join(timeout=5)
+            self._flush_stats()
+            
+            if self._txn_drain_thread and self._txn_drain_thread.is_alive():
+                self._txn_drain_thread.join(timeout=5)
+            self._txn_drain_thread = None
+            
+            # New rows now go straight to Celery; send whatever was queued after
+            # the drain thread's last pass
+            self._flush_transaction_queue()
+            
+            # Drain queued post-store work before reporting the service as stopped
+            if self._post_store_executors:
+                executors = self._post_store_executors
+                self._post_store_executors = None
+                for executor in executors:
+                    executor.shutdown(wait=True)
+            
+            # Update service status (only the fields owned here, so counters
+            # maintained with F() expressions are not overwritten)
+            now = timezone.now()
             self.service_status.is_running = False
-            self.service_status.service_stopped_at = timezone.now()
+            self.service_status.service_stopped_at = now
             self.service_status.active_connections = 0
-            self.service_status.save()
+            DicomServiceStatus.objects.filter(pk=self.service_status.pk).update(
+                is_running=False,
+                service_stopped_at=now,
+                active_connections=0,
+                updated_at=now
+            )
             
-            # Update config
-            self.config.last_service_stop = timezone.now()
-            self.config.save()
+            # Update config last_service_stop without triggering updated_at
+            DicomServerConfig.objects.filter(pk=1).update(
+                last_service_stop=now
+            )
             
             logger.info("DICOM SCP service stopped")
             return True
@@ -343,66 +616,222 @@ class DicomSCPService:
         self.stop()
         time.sleep(2)
         
-        # Reload configuration from database
-        if not self.initialize():
-            logger.error("Failed to reload configuration during restart")
-            return False
-        
+        # start() reloads configuration via initialize(); drop the cached
+        # configuration so the reload reads the database exactly once
+        clear_config_cache()
         return self.start()
     
-    def _run_server(self, handlers):
+    def submit_post_store(self, fn, *args, key=None):
         """
-        Run the DICOM SCP server (blocking call).
+        Run post-store work off the association thread.
+        Work with the same key (the calling AE title) runs in submission order.
+        Blocks while POST_STORE_MAX_PENDING items are already pending, and falls
+        back to running inline when the service has not been started.
         """
+        executors = self._post_store_executors
+        if not executors:
+            return fn(*args)
+        executor = executors[hash(key) % len(executors)]
+        
+        slots = self._post_store_slots
+        slots.acquire()
         try:
-            self.ae.start_server(
-                (self.config.host, self.config.port),
-                block=True,
-                evt_handlers=handlers
+            future = executor.submit(self._run_post_store, fn, *args)
+        except RuntimeError:
+            # Executor already shut down (service stopping)
+            slots.release()
+            return fn(*args)
+        future.add_done_callback(lambda _: slots.release())
+        return future
+    
+    def _run_post_store(self, fn, *args):
+        """
+        Run one post-store job on a worker thread. Nothing reads the future,
+        so failures are logged here; database connections are released
+        around the job because the worker threads are long-lived.
+        """
+        close_old_connections()
+        try:
+            return fn(*args)
+        except Exception:
+            logger.exception("Post-store task %s failed", getattr(fn, '__name__', fn))
+        finally:
+            close_old_connections()
+    
+    def _run_transaction_drain(self):
+        """
+        Collect queued transaction log rows and send them to Celery in batches
+        (runs in a daemon thread).
+        """
+        while True:
+            try:
+                batch = [self._txn_queue.get(timeout=TRANSACTION_BATCH_WINDOW)]
+            except queue.Empty:
+                if self._background_stop_event.is_set():
+                    break
+                continue
+            
+            deadline = time.monotonic() + TRANSACTION_BATCH_WINDOW
+            while len(batch) < TRANSACTION_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._txn_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            self._send_transaction_batch(batch)
+    
+    def _flush_transaction_queue(self):
+        """
+        Send all rows still in the transaction queue, in batches.
+        """
+        batch = []
+        while True:
+            try:
+                batch.append(self._txn_queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= TRANSACTION_BATCH_SIZE:
+                self._send_transaction_batch(batch)
+                batch = []
+        if batch:
+            self._send_transaction_batch(batch)
+    
+    def _send_transaction_batch(self, batch):
+        """
+        Queue one Celery task that bulk inserts a batch of transaction rows.
+        """
+        try:
+            from .tasks import log_dicom_transactions_bulk_async
+            log_dicom_transactions_bulk_async.delay(batch)
+        except Exception as e:
+            logger.error(f"Failed to queue transaction log batch ({len(batch)} rows): {str(e)}")
+    
+    def _run_stats_flush(self):
+        """
+        Periodically persist accumulated connection counters (runs in a daemon thread).
+        """
+        while not self._background_stop_event.wait(STATS_FLUSH_INTERVAL):
+            self._flush_stats()
+    
+    def _flush_stats(self):
+        """
+        Write pending connection counter deltas to DicomServiceStatus in one UPDATE.
+        """
+        with self._stats_lock:
+            pending = self._pending_stats
+            last_connection_at = self._pending_last_connection_at
+            incoming_nodes = self._pending_incoming_nodes
+            self._pending_stats = Counter()
+            self._pending_last_connection_at = None
+            self._pending_incoming_nodes = {}
+        
+        if incoming_nodes:
+            # One UPDATE for all remote nodes seen since the last flush
+            try:
+                RemoteDicomNode.objects.filter(pk__in=list(incoming_nodes)).update(
+                    last_incoming_connection=Case(
+                        *[When(pk=node_id, then=Value(seen_at)) for node_id, seen_at in incoming_nodes.items()],
+                        output_field=DateTimeField()
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Failed to flush remote node connection times: {str(e)}")
+        
+        if not pending and last_connection_at is None:
+            return
+        
+        updates = {}
+        if pending['total_connections']:
+            updates['total_connections'] = F('total_connections') + pending['total_connections']
+        if pending['active_connections']:
+            updates['active_connections'] = Greatest(
+                F('active_connections') + pending['active_connections'], 0
             )
+        if last_connection_at is not None:
+            updates['last_connection_at'] = last_connection_at
+        
+        if not updates:
+            return
+        
+        try:
+            DicomServiceStatus.objects.filter(pk=1).update(updated_at=timezone.now(), **updates)
+        except Exception as e:
+            logger.error(f"Failed to flush connection statistics: {str(e)}")
+    
+    def _run_server(self, server):
+        """
+        Run the DICOM SCP server (blocking call).
+        """
+        try:
+            # **BLOCKING**
+            server.serve_forever()
         except Exception as e:
             logger.error(f"DICOM SCP server error: {str(e)}")
             self._is_running = False
     
+    def _bind_operation_handlers(self):
+        """
+        Import the handler modules once and bind their entry points, so the
+        per-request dispatchers do not go through the import machinery.
+        """
+        from .handlers import c_store_handler, c_find_handler, c_move_handler, c_get_handler
+        
+        self._c_store_fn = c_store_handler.handle_c_store
+        self._c_find_fn = c_find_handler.handle_c_find
+        self._c_move_fn = c_move_handler.handle_c_move
+        self._c_get_fn = c_get_handler.handle_c_get
+        self._finalize_series_fn = c_store_handler.finalize_series_for_ae_title
+    
     def _get_event_handlers(self):
         """
         Get event handlers for DICOM operations.
+        The list is built once per combination of enabled services and reused
+        across restarts.
         """
-        handlers = []
+        enabled = (
+            self.config.enable_c_echo,
+            self.config.enable_c_store,
+            self.config.enable_c_find,
+            self.config.enable_c_move,
+            self.config.enable_c_get,
+        )
+        if self._event_handlers is not None and self._event_handlers[0] == enabled:
+            return self._event_handlers[1]
         
-        # Association handlers
-        handlers.append((evt.EVT_CONN_OPEN, self._handle_connection_open))
-        handlers.append((evt.EVT_CONN_CLOSE, self._handle_connection_close))
-        # EVT_REQUESTED is the correct place to validate and reject associations
-        # Validation must happen BEFORE acceptance to avoid abort after accept
-        handlers.append((evt.EVT_REQUESTED, self._handle_association_requested))
-        handlers.append((evt.EVT_ACCEPTED, self._handle_association_accepted))
-        handlers.append((evt.EVT_REJECTED, self._handle_association_rejected))
-        handlers.append((evt.EVT_RELEASED, self._handle_association_released))
-        handlers.append((evt.EVT_ABORTED, self._handle_association_aborted))
+        handlers = [
+            # Association handlers
+            (evt.EVT_CONN_OPEN, self._handle_connection_open),
+            (evt.EVT_CONN_CLOSE, self._handle_connection_close),
+            # EVT_REQUESTED is the correct place to validate and reject associations
+            # Validation must happen BEFORE acceptance to avoid abort after accept
+            (evt.EVT_REQUESTED, self._handle_association_requested),
+            (evt.EVT_ACCEPTED, self._handle_association_accepted),
+            (evt.EVT_REJECTED, self._handle_association_rejected),
+            (evt.EVT_RELEASED, self._handle_association_released),
+            (evt.EVT_ABORTED, self._handle_association_aborted),
+        ]
         
         # Service handlers
-        if self.config.enable_c_echo:
-            handlers.append((evt.EVT_C_ECHO, self._handle_c_echo))
-        
-        if self.config.enable_c_store:
-            handlers.append((evt.EVT_C_STORE, self._handle_c_store))
-        
-        if self.config.enable_c_find:
-            handlers.append((evt.EVT_C_FIND, self._handle_c_find))
-        
-        if self.config.enable_c_move:
-            handlers.append((evt.EVT_C_MOVE, self._handle_c_move))
-        
-        if self.config.enable_c_get:
-            handlers.append((evt.EVT_C_GET, self._handle_c_get))
+        service_handlers = (
+            (evt.EVT_C_ECHO, self._handle_c_echo),
+            (evt.EVT_C_STORE, self._handle_c_store),
+            (evt.EVT_C_FIND, self._handle_c_find),
+            (evt.EVT_C_MOVE, self._handle_c_move),
+            (evt.EVT_C_GET, self._handle_c_get),
+        )
+        handlers.extend(
+            handler for is_enabled, handler in zip(enabled, service_handlers) if is_enabled
+        )
         
+        self._event_handlers = (enabled, handlers)
         return handlers
     
     def _validate_calling_ae(self, calling_ae_title):
         """
         Validate calling AE title against allowed list using unified RemoteDicomNode model.
-Can
         """
         if not self.config.require_calling_ae_validation:
             return True
@@ -414,40 +843,22 @@ Can
             logger.debug("Empty calling AE title, checking if validation required")
         
         try:
-            from django.core.cache import cache
-            
-            # Check cache first to avoid database query on every file
-            cache_key = f'ae_validation_{calling_ae_title}'
-            cached_result = cache.get(cache_key)
-            
-            if cached_result is not None:
-                # Cache hit - use cached validation result
-                if cached_result.get('valid'):
-                    # Update last connection time asynchronously (non-blocking)
-                    from .tasks import update_remote_node_connection_async
-                    update_remote_node_connection_async.delay(cached_result['node_id'])
-                return cached_result.get('valid', False)
-            
-            # Cache miss - query database
-            remote_node = RemoteDicomNode.objects.filter(
-                incoming_ae_title=calling_ae_title,
-                allow_incoming=True,
-                is_active=True
-            ).first()
-            
-            if remote_node:
-                # Cache the validation result for 60 seconds
-                cache.set(cache_key, {'valid': True, 'node_id': remote_node.id}, 60)
-                
-                # Update last incoming connection time asynchronously (non-blocking)
-                from .tasks import update_remote_node_connection_async
-                update_remote_node_connection_async.delay(remote_node.id)
-                return True
-            else:
-                # Cache negative result for 30 seconds (shorter to allow quick fixes)
-                cache.set(cache_key, {'valid': False}, 30)
+            # In-memory lookup, rebuilt after RemoteDicomNode changes or expiry
+            node_id = get_authorized_ae_titles().get(calling_ae_title)
+            if node_id is None:
                 return False
             
+            # Record the last incoming connection time; written in one batched
+            # UPDATE by the stats flush thread while the service is running
+            stats_thread = self._stats_thread
+            if stats_thread is not None and stats_thread.is_alive():
+                with self._stats_lock:
+                    self._pending_incoming_nodes[node_id] = timezone.now()
+            else:
+                from .tasks import update_remote_node_connection_async
+                update_remote_node_connection_async.delay(node_id)
+            return True
+            
         except Exception as e:
             logger.error(f"Error validating calling AE: {str(e)}")
             return False
@@ -462,23 +873,37 @@ Can
         if not self.config.allowed_ip_addresses:
             return True
         
-        allowed_ips = [ip.strip() for ip in self.config.allowed_ip_addresses.split(',')]
-        
-        # Simple IP matching (can be enhanced with CIDR support)
-        for allowed_ip in allowed_ips:
-            if allowed_ip in remote_ip or remote_ip.startswith(allowed_ip.split('/')[0]):
-                return True
+        try:
+            ip = ipaddress.ip_address(remote_ip)
+        except ValueError:
+            logger.warning(f"Invalid remote IP address: {remote_ip}")
+            return False
         
-        return False
+        return any(ip in network for network in self._allowed_networks)
+    
+    def _parse_allowed_networks(self):
+        """
+        Parse the comma-separated allowed IP list into ip_network objects.
+        Accepts single addresses and CIDR ranges; invalid entries are skipped.
+        """
+        networks = []
+        for entry in (self.config.allowed_ip_addresses or '').split(','):
+            entry = entry.strip()
+            if not entry:
+                continue
+            try:
+                networks.append(ipaddress.ip_network(entry, strict=False))
+            except ValueError:
+                logger.warning(f"Ignoring invalid allowed IP address entry: {entry}")
+        return networks
     
     def _log_transaction(self, transaction_type, status, event, **kwargs):
         """
         Log DICOM transaction to database asynchronously using Celery.
         Non-blocking operation - queues the write to a background worker.
+        While the service is running rows are batched by the drain thread.
         """
         try:
-            from .tasks import log_dicom_transaction_async
-            
             transaction_data = {
                 'transaction_type': transaction_type,
                 'status': status,
@@ -489,8 +914,14 @@ Can
             }
             transaction_data.update(kwargs)
             
-            # Queue the database write to Celery worker (non-blocking)
-            log_dicom_transaction_async.delay(transaction_data)
+            # Batch through the drain thread when the service is running,
+            # otherwise queue the database write to Celery directly
+            drain_thread = self._txn_drain_thread
+            if drain_thread is not None and drain_thread.is_alive():
+                self._txn_queue.put_nowait(transaction_data)
+            else:
+                from .tasks import log_dicom_transaction_async
+                log_dicom_transaction_async.delay(transaction_data)
             
         except Exception as e:
             logger.error(f"Failed to queue transaction log: {str(e)}")
@@ -499,27 +930,28 @@ Can
     
     def _handle_connection_open(self, event):
         """Handle connection open event."""
-        if self.config.log_connection_attempts:
+        if self.config.log_connection_attempts and logger.isEnabledFor(logging.INFO):
             # event.address is a tuple (ip, port)
             address_info = event.address if isinstance(event.address, tuple) else (event.address, 'unknown')
-            logger.info(f"Connection opened from {address_info[0]}:{address_info[1]}")
+            logger.info("Connection opened from %s:%s", address_info[0], address_info[1])
         
-        # Update active connections
-        self.service_status.total_connections += 1
-        self.service_status.active_connections += 1
-        self.service_status.last_connection_at = timezone.now()
-        self.service_status.save()
+        # Update active connections (persisted by the stats flush thread)
+        now = timezone.now()
+        with self._stats_lock:
+            self._pending_stats['total_connections'] += 1
+            self._pending_stats['active_connections'] += 1
+            self._pending_last_connection_at = now
     
     def _handle_connection_close(self, event):
         """Handle connection close event."""
-        if self.config.log_connection_attempts:
+        if self.config.log_connection_attempts and logger.isEnabledFor(logging.INFO):
             # event.address is a tuple (ip, port)
             address_info = event.address if isinstance(event.address, tuple) else (event.address, 'unknown')
-            logger.info(f"Connection closed from {address_info[0]}:{address_info[1]}")
+            logger.info("Connection closed from %s:%s", address_info[0], address_info[1])
         
-        # Update active connections
-        self.service_status.active_connections = max(0, self.service_status.active_connections - 1)
-        self.service_status.save()
+        # Update active connections (persisted by the stats flush thread)
+        with self._stats_lock:
+            self._pending_stats['active_connections'] -= 1
     
     def _handle_association_requested(self, event):
         """
@@ -532,16 +964,16 @@ Can
             calling_ae_raw = event.assoc.requestor.primitive.calling_ae_title
             calling_ae = calling_ae_raw.decode('ascii').strip() if calling_ae_raw else ''
         except (AttributeError, UnicodeDecodeError) as e:
-            logger.warning(f"Failed to decode calling AE title: {e}")
+            logger.warning("Failed to decode calling AE title: %s", e)
             calling_ae = ''
         
         remote_ip = event.assoc.requestor.address
         
-        logger.info(f"Association requested from {calling_ae} ({remote_ip})")
+        logger.info("Association requested from %s (%s)", calling_ae, remote_ip)
         
         # Validate calling AE title
         if not self._validate_calling_ae(calling_ae):
-            logger.warning(f"Association rejected: Calling AE '{calling_ae}' not authorized")
+            logger.warning("Association rejected: Calling AE '%s' not authorized", calling_ae)
             self._log_transaction(
                 'ASSOCIATION',
                 'REJECTED',
@@ -554,7 +986,7 @@ Can
         
         # Validate remote IP
         if not self._validate_remote_ip(remote_ip):
-            logger.warning(f"Association rejected: Remote IP '{remote_ip}' not authorized")
+            logger.warning("Association rejected: Remote IP '%s' not authorized", remote_ip)
             self._log_transaction(
                 'ASSOCIATION',
                 'REJECTED',
@@ -565,7 +997,7 @@ Can
             event.assoc.acse.send_reject(0x01, 0x01, 0x07)
             return
         
-        logger.debug(f"Association validation passed for {calling_ae} ({remote_ip})")
+        logger.debug("Association validation passed for %s (%s)", calling_ae, remote_ip)
     
     def _handle_association_accepted(self, event):
         """
@@ -573,10 +1005,9 @@ Can
         Validation already performed in EVT_REQUESTED handler.
         This handler just logs the successful acceptance.
         """
-        calling_ae = event.assoc.requestor.ae_title
-        remote_ip = event.assoc.requestor.address
-        
-        logger.info(f"Association accepted from {calling_ae} ({remote_ip})")
+        if logger.isEnabledFor(logging.INFO):
+            requestor = event.assoc.requestor
+            logger.info("Association accepted from %s (%s)", requestor.ae_title, requestor.address)
         
         self._log_transaction(
             'ASSOCIATION',
@@ -586,7 +1017,7 @@ Can
     
     def _handle_association_rejected(self, event):
         """Handle association rejected event."""
-        logger.warning(f"Association rejected from {event.assoc.requestor.address}")
+        logger.warning("Association rejected from %s", event.assoc.requestor.address)
         
         self._log_transaction(
             'ASSOCIATION',
@@ -597,19 +1028,23 @@ Can
     def _handle_association_released(self, event):
         """Handle association released event."""
         calling_ae = event.assoc.requestor.ae_title
-        logger.debug(f"Association released from {calling_ae}")
+        logger.debug("Association released from %s", calling_ae)
         
         # Finalize any pending series for this AE Title
-        # This ensures Task2 is triggered for the last series in the transfer
-        from .handlers.c_store_handler import finalize_series_for_ae_title
-        result = finalize_series_for_ae_title(calling_ae)
+        # This ensures Task2 is triggered for the last series in the transfer.
+        # Queued behind the association's post-store work so it sees every instance.
+        self.submit_post_store(self._finalize_series, calling_ae, key=calling_ae)
+    
+    def _finalize_series(self, calling_ae):
+        """Finalize the pending series for an AE Title (runs on the post-store worker)."""
+        result = self._finalize_series_fn(calling_ae)
         
         if result.get('triggered_series'):
-            logger.info(f"Finalized series on association release: {result['triggered_series']['series_uid'][:8]}...")
+            logger.info("Finalized series on association release: %s...", result['triggered_series']['series_uid'][:8])
     
     def _handle_association_aborted(self, event):
         """Handle association aborted event."""
-        logger.warning(f"Association aborted from {event.assoc.requestor.ae_title}")
+        logger.warning("Association aborted from %s", event.assoc.requestor.ae_title)
         
         self._log_transaction(
             'ASSOCIATION',
@@ -617,8 +1052,18 @@ Can
             event
         )
         
-        self.service_status.total_errors += 1
-        self.service_status.save()
+        self.increment_error_count()
+    
+    def increment_error_count(self):
+        """
+        Atomically increment the service error counter in the database.
+        """
+        try:
+            DicomServiceStatus.objects.filter(pk=1).update(
+                total_errors=F('total_errors') + 1
+            )
+        except Exception as e:
+            logger.error(f"Failed to update error count: {str(e)}")
     
     def _handle_c_echo(self, event):
         """
@@ -626,10 +1071,9 @@ Can
         C-ECHO is always allowed regardless of AE validation settings,
         as it's used for connectivity testing.
         """
-        calling_ae = event.assoc.requestor.ae_title
-        remote_ip = event.assoc.requestor.address
-        
-        logger.info(f"C-ECHO request from {calling_ae} ({remote_ip})")
+        if logger.isEnabledFor(logging.INFO):
+            requestor = event.assoc.requestor
+            logger.info("C-ECHO request from %s (%s)", requestor.ae_title, requestor.address)
         
         self._log_transaction(
             'C-ECHO',
@@ -642,34 +1086,34 @@ Can
     def _handle_c_store(self, event):
         """
         Handle C-STORE request (receive DICOM file).
-        This is implemented in a separate file for better organization.
+        This is implemented in a separate file for better organization
+        and bound in _bind_operation_handlers().
         """
-        from .handlers.c_store_handler import handle_c_store
-        return handle_c_store(self, event)
+        return self._c_store_fn(self, event)
     
     def _handle_c_find(self, event):
         """
         Handle C-FIND request (query).
-        This is implemented in a separate file for better organization.
+        This is implemented in a separate file for better organization
+        and bound in _bind_operation_handlers().
         """
-        from .handlers.c_find_handler import handle_c_find
-        return handle_c_find(self, event)
+        return self._c_find_fn(self, event)
     
     def _handle_c_move(self, event):
         """
         Handle C-MOVE request (retrieve).
-        This is implemented in a separate file for better organization.
+        This is implemented in a separate file for better organization
+        and bound in _bind_operation_handlers().
         """
-        from .handlers.c_move_handler import handle_c_move
-        return handle_c_move(self, event)
+        return self._c_move_fn(self, event)
     
     def _handle_c_get(self, event):
         """
         Handle C-GET request (retrieve).
-        This is implemented in a separate file for better organization.
+        This is implemented in a separate file for better organization
+        and bound in _bind_operation_handlers().
         """
-        from .handlers.c_get_handler import handle_c_get
-        return handle_c_get(self, event)
+        return self._c_get_fn(self, event)
 
     @property
     def is_running(self):
@@ -5,14 +5,84 @@ Uses database models for efficient querying.
 
 import logging
 import os
-from pathlib import Path
-from django.db.models import Q
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from django.db.models import F, Lookup, Sum
 
 from pydicom import dcmread
 from pydicom.dataset import Dataset
 
+from dicom_handler.models import (
+    Patient, DICOMStudy, DICOMSeries, DICOMInstance, RTStructureFileImport
+)
+
 logger = logging.getLogger(__name__)
 
+# Rows fetched per database round trip while streaming C-FIND results
+QUERY_CHUNK_SIZE = 500
+
+# Instance file headers are read in parallel batches for IMAGE-level queries
+HEADER_READ_WORKERS = 8
+HEADER_READ_BATCH_SIZE = 32
+
+# Only these elements are decoded when reading instance files for C-FIND
+FILE_TAGS = ('SOPClassUID', 'InstanceNumber')
+
+# Columns read when building C-FIND responses; everything else is deferred
+PATIENT_COLUMNS = ('patient_id', 'patient_name', 'patient_date_of_birth', 'patient_gender')
+STUDY_COLUMNS = (
+    'study_instance_uid', 'study_date', 'study_time', 'study_description',
+    'accession_number', 'study_id', 'study_modality',
+)
+SERIES_COLUMNS = ('series_instance_uid', 'series_date', 'series_description', 'instance_count')
+INSTANCE_COLUMNS = ('sop_instance_uid', 'sop_class_uid', 'instance_number', 'instance_path')
+RT_STRUCT_COLUMNS = (
+    'reidentified_rt_structure_file_series_instance_uid',
+    'reidentified_rt_structure_file_sop_instance_uid',
+    'reidentified_rt_structure_file_sop_class_uid',
+)
+
+# Identifier keywords used as C-FIND matching keys at each query level
+PATIENT_KEYWORDS = ('PatientID', 'PatientName')
+STUDY_KEYWORDS = PATIENT_KEYWORDS + (
+    'StudyInstanceUID', 'StudyDate', 'StudyDescription', 'AccessionNumber',
+)
+SERIES_KEYWORDS = PATIENT_KEYWORDS + (
+    'StudyInstanceUID', 'StudyDate', 'StudyDescription',
+    'SeriesInstanceUID', 'SeriesDescription', 'Modality',
+)
+QUERY_KEYWORDS_BY_LEVEL = {
+    'PATIENT': PATIENT_KEYWORDS,
+    'STUDY': STUDY_KEYWORDS,
+    'SERIES': SERIES_KEYWORDS,
+    'IMAGE': SERIES_KEYWORDS + ('SOPInstanceUID',),
+}
+
+
+def _related_columns(prefix, columns):
+    """Prefix column names with a related field path for use with .only()."""
+    return tuple(f"{prefix}__{column}" for column in columns)
+
+
+# .only() arguments for series rows joined to their study and patient
+SERIES_QUERY_COLUMNS = (
+    SERIES_COLUMNS
+    + _related_columns('study', STUDY_COLUMNS)
+    + _related_columns('study__patient', PATIENT_COLUMNS)
+)
+
+
+def _format_da(d):
+    """Format a date as a DICOM DA value (YYYYMMDD) without strftime."""
+    return f"{d.year:04d}{d.month:02d}{d.day:02d}"
+
+
+def _format_tm(t):
+    """Format a time as a DICOM TM value (HHMMSS) without strftime."""
+    return f"{t.hour:02d}{t.minute:02d}{t.second:02d}"
+
 
 def handle_c_find(service, event):
     """
@@ -28,32 +98,39 @@ def handle_c_find(service, event):
     calling_ae = event.assoc.requestor.ae_title
     remote_ip = event.assoc.requestor.address
     
-    logger.info(f"C-FIND request from {calling_ae} ({remote_ip})")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("C-FIND request from %s (%s)", calling_ae, remote_ip)
     
     # Get the query dataset
     query_ds = event.identifier
     
     try:
         # Determine query level
-        query_level = getattr(query_ds, 'QueryRetrieveLevel', 'STUDY')
+        query_level = query_ds.get('QueryRetrieveLevel', 'STUDY')
         
-        logger.debug(f"C-FIND query level: {query_level}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("C-FIND query level: %s", query_level)
         
         # Search for matching DICOM files in storage
         matches = _search_dicom_storage(service, query_ds, query_level)
         
-        # Yield each match
+        # Yield each match as it is read from the database
+        match_count = 0
         for match in matches:
+            match_count += 1
             yield (0xFF00, match)  # Pending status with match
         
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("C-FIND found %d matches at %s level", match_count, query_level)
+        
         # Log successful query
         service._log_transaction(
             'C-FIND',
             'SUCCESS',
             event,
-            patient_id=getattr(query_ds, 'PatientID', None),
-            study_instance_uid=getattr(query_ds, 'StudyInstanceUID', None),
-            series_instance_uid=getattr(query_ds, 'SeriesInstanceUID', None)
+            patient_id=query_ds.get('PatientID'),
+            study_instance_uid=query_ds.get('StudyInstanceUID'),
+            series_instance_uid=query_ds.get('SeriesInstanceUID')
         )
         
     except Exception as e:
@@ -64,8 +141,7 @@ def handle_c_find(service, event):
             event,
             error_message=str(e)
         )
-        service.service_status.total_errors += 1
-        service.service_status.save()
+        service.increment_error_count()
 
 
 def _search_dicom_storage(service, query_ds, query_level):
@@ -73,11 +149,9 @@ def _search_dicom_storage(service, query_ds, query_level):
     Search DICOM storage using database models.
     
     Queries Patient, DICOMStudy, and DICOMSeries models for efficient searching.
+    Matches are yielded as they are read so the first response can be sent
+    before the whole result set has been fetched.
     """
-    from dicom_handler.models import Patient, DICOMStudy, DICOMSeries
-    
-    matches = []
-    
     # Get max_query_results from service config
     max_results = 10000  # Default fallback
     try:
@@ -86,22 +160,12 @@ def _search_dicom_storage(service, query_ds, query_level):
     except Exception as e:
         logger.warning(f"Could not get max_query_results from config, using default: {e}")
     
-    # Extract query parameters
-    query_params = {
-        'PatientID': getattr(query_ds, 'PatientID', None),
-        'PatientName': getattr(query_ds, 'PatientName', None),
-        'StudyInstanceUID': getattr(query_ds, 'StudyInstanceUID', None),
-        'StudyDate': getattr(query_ds, 'StudyDate', None),
-        'StudyTime': getattr(query_ds, 'StudyTime', None),
-        'StudyDescription': getattr(query_ds, 'StudyDescription', None),
-        'AccessionNumber': getattr(query_ds, 'AccessionNumber', None),
-        'ModalitiesInStudy': getattr(query_ds, 'ModalitiesInStudy', None),
-        'SeriesInstanceUID': getattr(query_ds, 'SeriesInstanceUID', None),
-        'SeriesNumber': getattr(query_ds, 'SeriesNumber', None),
-        'SeriesDescription': getattr(query_ds, 'SeriesDescription', None),
-        'Modality': getattr(query_ds, 'Modality', None),
-        'SOPInstanceUID': getattr(query_ds, 'SOPInstanceUID', None),
-    }
+    # Extract query parameters; universal matches ('*') need no filter
+    query_params = {}
+    for keyword in QUERY_KEYWORDS_BY_LEVEL.get(query_level, ()):
+        value = query_ds.get(keyword)
+        if value is not None and str(value).strip('*'):
+            query_params[keyword] = value
     
     try:
         if query_level == 'PATIENT':
@@ -114,22 +178,29 @@ def _search_dicom_storage(service, query_ds, query_level):
             matches = _query_images(query_params, max_results)
         else:
             logger.warning(f"Unsupported query level: {query_level}")
-            return matches
+            return
         
-        logger.info(f"C-FIND found {len(matches)} matches at {query_level} level")
-        return matches
+        # The limit is applied in SQL; warn when it may have truncated the results
+        match_count = 0
+        for match in matches:
+            match_count += 1
+            yield match
+        
+        if match_count >= max_results:
+            logger.warning(
+                "C-FIND %s query reached max_query_results (%d), results may be truncated",
+                query_level, max_results
+            )
         
     except Exception as e:
         logger.error(f"Error querying database: {str(e)}")
-        return []
 
 
 def _query_patients(query_params, max_results=10000):
     """
-    Query Patient model and return matching DICOM datasets.
+    Query Patient model and yield matching DICOM datasets.
+    Rows are read as tuples since no model behaviour is needed.
     """
-    from dicom_handler.models import Patient
-    
     queryset = Patient.objects.all()
     
     # Apply filters with wildcard support
@@ -140,49 +211,33 @@ def _query_patients(query_params, max_results=10000):
         queryset = _apply_wildcard_filter(queryset, 'patient_name', str(query_params['PatientName']))
     
     # Limit results
-    queryset = queryset[:max_results]
+    rows = queryset.values_list(*PATIENT_COLUMNS)[:max_results]
     
     # Convert to DICOM datasets
-    matches = []
-    for patient in queryset:
+    for patient_id, patient_name, date_of_birth, gender in rows.iterator(chunk_size=QUERY_CHUNK_SIZE):
         ds = Dataset()
         
         # Set QueryRetrieveLevel
         ds.QueryRetrieveLevel = 'PATIENT'
         
-        if patient.patient_id:
-            ds.PatientID = patient.patient_id
-        else:
-            ds.PatientID = ''
-            
-        if patient.patient_name:
-            ds.PatientName = patient.patient_name
-        else:
-            ds.PatientName = ''
-            
-        if patient.patient_date_of_birth:
-            ds.PatientBirthDate = patient.patient_date_of_birth.strftime('%Y%m%d')
-        else:
-            ds.PatientBirthDate = ''
+        ds.PatientID = patient_id or ''
+        ds.PatientName = patient_name or ''
+        ds.PatientBirthDate = _format_da(date_of_birth) if date_of_birth else ''
+        ds.PatientSex = gender or ''
             
-        if patient.patient_gender:
-            ds.PatientSex = patient.patient_gender
-        else:
-            ds.PatientSex = ''
-            
-        matches.append(ds)
-    
-    return matches
+        yield ds
 
 
 def _query_studies(query_params, max_results=10000):
     """
-    Query DICOMStudy model and return matching DICOM datasets.
+    Query DICOMStudy model and yield matching DICOM datasets.
     """
-    from dicom_handler.models import DICOMStudy, DICOMSeries
-    from django.db.models import Count, Sum
-    
-    queryset = DICOMStudy.objects.select_related('patient').all()
+    # NumberOfStudyRelatedInstances is summed over the study's series in the same query
+    queryset = DICOMStudy.objects.select_related('patient').only(
+        *STUDY_COLUMNS, *_related_columns('patient', PATIENT_COLUMNS)
+    ).annotate(
+        total_instances=Sum('dicomseries__instance_count')
+    )
     
     # Patient level filters
     if query_params.get('PatientID'):
@@ -193,7 +248,7 @@ def _query_studies(query_params, max_results=10000):
     
     # Study level filters
     if query_params.get('StudyInstanceUID'):
-        queryset = _apply_wildcard_filter(queryset, 'study_instance_uid', query_params['StudyInstanceUID'])
+        queryset = _apply_uid_filter(queryset, 'study_instance_uid', query_params['StudyInstanceUID'])
     
     if query_params.get('StudyDate'):
         queryset = _apply_date_filter(queryset, 'study_date', query_params['StudyDate'])
@@ -208,100 +263,49 @@ def _query_studies(query_params, max_results=10000):
     queryset = queryset[:max_results]
     
     # Convert to DICOM datasets
-    matches = []
-    for study in queryset:
+    for study in queryset.iterator(chunk_size=QUERY_CHUNK_SIZE):
+        patient = study.patient
+        
         ds = Dataset()
         
         # Set QueryRetrieveLevel - CRITICAL for retrieve operations
         ds.QueryRetrieveLevel = 'STUDY'
         
         # Patient info
-        if study.patient.patient_id:
-            ds.PatientID = study.patient.patient_id
-        else:
-            ds.PatientID = ''  # Include empty value if not present
-            
-        if study.patient.patient_name:
-            ds.PatientName = study.patient.patient_name
-        else:
-            ds.PatientName = ''  # Include empty value if not present
-            
-        if study.patient.patient_date_of_birth:
-            ds.PatientBirthDate = study.patient.patient_date_of_birth.strftime('%Y%m%d')
-        else:
-            ds.PatientBirthDate = ''  # Include empty value if not present
-            
-        if study.patient.patient_gender:
-            ds.PatientSex = study.patient.patient_gender
-        else:
-            ds.PatientSex = ''  # Include empty value if not present
+        ds.PatientID = patient.patient_id or ''
+        ds.PatientName = patient.patient_name or ''
+        ds.PatientBirthDate = _format_da(patient.patient_date_of_birth) if patient.patient_date_of_birth else ''
+        ds.PatientSex = patient.patient_gender or ''
             
         # Study info - REQUIRED fields for retrieve operations
-        if study.study_instance_uid:
-            ds.StudyInstanceUID = study.study_instance_uid
-        else:
-            ds.StudyInstanceUID = ''  # Include empty value if not present
-            
-        if study.study_date:
-            ds.StudyDate = study.study_date.strftime('%Y%m%d')
-        else:
-            ds.StudyDate = ''  # Include empty value if not present
+        ds.StudyInstanceUID = study.study_instance_uid or ''
+        ds.StudyDate = _format_da(study.study_date) if study.study_date else ''
             
         # StudyTime - include actual value or empty if not available
-        if study.study_time:
-            ds.StudyTime = study.study_time.strftime('%H%M%S')
-        else:
-            ds.StudyTime = ''
-        
-        if study.study_description:
-            ds.StudyDescription = study.study_description
-        else:
-            ds.StudyDescription = ''  # Include empty value if not present
+        ds.StudyTime = _format_tm(study.study_time) if study.study_time else ''
+        ds.StudyDescription = study.study_description or ''
             
         # AccessionNumber - REQUIRED for many PACS systems
-        if study.accession_number:
-            ds.AccessionNumber = study.accession_number
-        else:
-            ds.AccessionNumber = ''
+        ds.AccessionNumber = study.accession_number or ''
         
         # StudyID - REQUIRED for many PACS systems
-        if study.study_id:
-            ds.StudyID = study.study_id
-        else:
-            ds.StudyID = ''
-        
-        if study.study_modality:
-            ds.ModalitiesInStudy = study.study_modality
-        else:
-            ds.ModalitiesInStudy = ''
-            
-        # NumberOfStudyRelatedInstances - calculate from series
-        try:
-            total_instances = DICOMSeries.objects.filter(
-                study=study
-            ).aggregate(total=Sum('instance_count'))['total']
+        ds.StudyID = study.study_id or ''
+        ds.ModalitiesInStudy = study.study_modality or ''
             
-            if total_instances:
-                ds.NumberOfStudyRelatedInstances = str(total_instances)
-            else:
-                ds.NumberOfStudyRelatedInstances = '0'
-        except Exception as e:
-            logger.warning(f"Could not calculate instance count for study {study.study_instance_uid}: {e}")
-            ds.NumberOfStudyRelatedInstances = '0'
+        # NumberOfStudyRelatedInstances - annotated from series
+        ds.NumberOfStudyRelatedInstances = str(study.total_instances or 0)
             
-        matches.append(ds)
-    
-    return matches
+        yield ds
 
 
 def _query_images(query_params, max_results=10000):
     """
-    Query DICOMInstance model and RTStructureFileImport model and return matching DICOM datasets at IMAGE level.
+    Query DICOMInstance model and RTStructureFileImport model and yield matching DICOM datasets at IMAGE level.
     Includes both regular DICOM instances and RT Structure Set files.
     """
-    from dicom_handler.models import DICOMInstance, RTStructureFileImport
-    
-    queryset = DICOMInstance.objects.select_related('series_instance_uid__study__patient').all()
+    queryset = DICOMInstance.objects.select_related('series_instance_uid__study__patient').only(
+        *INSTANCE_COLUMNS, *_related_columns('series_instance_uid', SERIES_QUERY_COLUMNS)
+    )
     
     # Patient level filters
     if query_params.get('PatientID'):
@@ -312,7 +316,7 @@ def _query_images(query_params, max_results=10000):
     
     # Study level filters
     if query_params.get('StudyInstanceUID'):
-        queryset = _apply_wildcard_filter(queryset, 'series_instance_uid__study__study_instance_uid', query_params['StudyInstanceUID'])
+        queryset = _apply_uid_filter(queryset, 'series_instance_uid__study__study_instance_uid', query_params['StudyInstanceUID'])
     
     if query_params.get('StudyDate'):
         queryset = _apply_date_filter(queryset, 'series_instance_uid__study__study_date', query_params['StudyDate'])
@@ -322,14 +326,14 @@ def _query_images(query_params, max_results=10000):
     
     # Series level filters
     if query_params.get('SeriesInstanceUID'):
-        queryset = _apply_wildcard_filter(queryset, 'series_instance_uid__series_instance_uid', query_params['SeriesInstanceUID'])
+        queryset = _apply_uid_filter(queryset, 'series_instance_uid__series_instance_uid', query_params['SeriesInstanceUID'])
     
     if query_params.get('SeriesDescription'):
         queryset = _apply_wildcard_filter(queryset, 'series_instance_uid__series_description', query_params['SeriesDescription'])
     
     # Instance (IMAGE) level filters
     if query_params.get('SOPInstanceUID'):
-        queryset = _apply_wildcard_filter(queryset, 'sop_instance_uid', query_params['SOPInstanceUID'])
+        queryset = _apply_uid_filter(queryset, 'sop_instance_uid', query_params['SOPInstanceUID'])
     
     # Check if modality filter is specified
     modality_filter = query_params.get('Modality')
@@ -353,7 +357,9 @@ def _query_images(query_params, max_results=10000):
     
     # Query RT Structure files only if needed
     if include_rt_structures:
-        rt_queryset = RTStructureFileImport.objects.select_related('deidentified_series_instance_uid__study__patient').filter(
+        rt_queryset = RTStructureFileImport.objects.select_related('deidentified_series_instance_uid__study__patient').only(
+            *RT_STRUCT_COLUMNS, *_related_columns('deidentified_series_instance_uid', SERIES_QUERY_COLUMNS)
+        ).filter(
             reidentified_rt_structure_file_path__isnull=False
         )
     else:
@@ -367,7 +373,7 @@ def _query_images(query_params, max_results=10000):
         rt_queryset = _apply_wildcard_filter(rt_queryset, 'deidentified_series_instance_uid__study__patient__patient_name', str(query_params['PatientName']))
     
     if query_params.get('StudyInstanceUID'):
-        rt_queryset = _apply_wildcard_filter(rt_queryset, 'deidentified_series_instance_uid__study__study_instance_uid', query_params['StudyInstanceUID'])
+        rt_queryset = _apply_uid_filter(rt_queryset, 'deidentified_series_instance_uid__study__study_instance_uid', query_params['StudyInstanceUID'])
     
     if query_params.get('StudyDate'):
         rt_queryset = _apply_date_filter(rt_queryset, 'deidentified_series_instance_uid__study__study_date', query_params['StudyDate'])
@@ -376,119 +382,67 @@ def _query_images(query_params, max_results=10000):
         rt_queryset = _apply_wildcard_filter(rt_queryset, 'deidentified_series_instance_uid__study__study_description', query_params['StudyDescription'])
     
     if query_params.get('SeriesInstanceUID'):
-        rt_queryset = _apply_wildcard_filter(rt_queryset, 'reidentified_rt_structure_file_series_instance_uid', query_params['SeriesInstanceUID'])
+        rt_queryset = _apply_uid_filter(rt_queryset, 'reidentified_rt_structure_file_series_instance_uid', query_params['SeriesInstanceUID'])
     
     if query_params.get('SeriesDescription'):
         rt_queryset = _apply_wildcard_filter(rt_queryset, 'deidentified_series_instance_uid__series_description', query_params['SeriesDescription'])
     
     if query_params.get('SOPInstanceUID'):
-        rt_queryset = _apply_wildcard_filter(rt_queryset, 'reidentified_rt_structure_file_sop_instance_uid', query_params['SOPInstanceUID'])
+        rt_queryset = _apply_uid_filter(rt_queryset, 'reidentified_rt_structure_file_sop_instance_uid', query_params['SOPInstanceUID'])
     
     # Limit RT Structure results
     rt_queryset = rt_queryset[:max_results]
     
     # Convert to DICOM datasets
-    matches = []
-    for instance in queryset:
+    instance_count = 0
+    for instance, file_tags in _iter_with_file_tags(queryset.iterator(chunk_size=QUERY_CHUNK_SIZE)):
+        series = instance.series_instance_uid
+        study = series.study
+        patient = study.patient
+        
         ds = Dataset()
         
         # Set QueryRetrieveLevel - CRITICAL for retrieve operations
         ds.QueryRetrieveLevel = 'IMAGE'
         
         # Patient info
-        if instance.series_instance_uid.study.patient.patient_id:
-            ds.PatientID = instance.series_instance_uid.study.patient.patient_id
-        else:
-            ds.PatientID = ''
-            
-        if instance.series_instance_uid.study.patient.patient_name:
-            ds.PatientName = instance.series_instance_uid.study.patient.patient_name
-        else:
-            ds.PatientName = ''
-            
-        if instance.series_instance_uid.study.patient.patient_date_of_birth:
-            ds.PatientBirthDate = instance.series_instance_uid.study.patient.patient_date_of_birth.strftime('%Y%m%d')
-        else:
-            ds.PatientBirthDate = ''
-            
-        if instance.series_instance_uid.study.patient.patient_gender:
-            ds.PatientSex = instance.series_instance_uid.study.patient.patient_gender
-        else:
-            ds.PatientSex = ''
+        ds.PatientID = patient.patient_id or ''
+        ds.PatientName = patient.patient_name or ''
+        ds.PatientBirthDate = _format_da(patient.patient_date_of_birth) if patient.patient_date_of_birth else ''
+        ds.PatientSex = patient.patient_gender or ''
             
         # Study info - REQUIRED for retrieve operations
-        if instance.series_instance_uid.study.study_instance_uid:
-            ds.StudyInstanceUID = instance.series_instance_uid.study.study_instance_uid
-        else:
-            ds.StudyInstanceUID = ''
-            
-        if instance.series_instance_uid.study.study_date:
-            ds.StudyDate = instance.series_instance_uid.study.study_date.strftime('%Y%m%d')
-        else:
-            ds.StudyDate = ''
-            
-        if instance.series_instance_uid.study.study_time:
-            ds.StudyTime = instance.series_instance_uid.study.study_time.strftime('%H%M%S')
-        else:
-            ds.StudyTime = ''
-        
-        if instance.series_instance_uid.study.study_description:
-            ds.StudyDescription = instance.series_instance_uid.study.study_description
-        else:
-            ds.StudyDescription = ''
-            
-        if instance.series_instance_uid.study.accession_number:
-            ds.AccessionNumber = instance.series_instance_uid.study.accession_number
-        else:
-            ds.AccessionNumber = ''
-            
-        if instance.series_instance_uid.study.study_id:
-            ds.StudyID = instance.series_instance_uid.study.study_id
-        else:
-            ds.StudyID = ''
+        ds.StudyInstanceUID = study.study_instance_uid or ''
+        ds.StudyDate = _format_da(study.study_date) if study.study_date else ''
+        ds.StudyTime = _format_tm(study.study_time) if study.study_time else ''
+        ds.StudyDescription = study.study_description or ''
+        ds.AccessionNumber = study.accession_number or ''
+        ds.StudyID = study.study_id or ''
         
         # Series info - REQUIRED for retrieve operations
-        if instance.series_instance_uid.series_instance_uid:
-            ds.SeriesInstanceUID = instance.series_instance_uid.series_instance_uid
-        else:
-            ds.SeriesInstanceUID = ''
-            
-        if instance.series_instance_uid.series_date:
-            ds.SeriesDate = instance.series_instance_uid.series_date.strftime('%Y%m%d')
-        else:
-            ds.SeriesDate = ''
-            
+        ds.SeriesInstanceUID = series.series_instance_uid or ''
+        ds.SeriesDate = _format_da(series.series_date) if series.series_date else ''
         ds.SeriesTime = ''
-        
-        if instance.series_instance_uid.series_description:
-            ds.SeriesDescription = instance.series_instance_uid.series_description
-        else:
-            ds.SeriesDescription = ''
-        
+        ds.SeriesDescription = series.series_description or ''
         ds.SeriesNumber = ''
         ds.Modality = ''
         
         # Instance (IMAGE) info - REQUIRED for IMAGE level
-        if instance.sop_instance_uid:
-            ds.SOPInstanceUID = instance.sop_instance_uid
-        else:
-            ds.SOPInstanceUID = ''
+        ds.SOPInstanceUID = instance.sop_instance_uid or ''
         
-        # Read actual DICOM file to get SOPClassUID and InstanceNumber if available
-        if instance.instance_path and os.path.exists(instance.instance_path):
-            try:
-                file_ds = dcmread(instance.instance_path, stop_before_pixels=True)
-                if hasattr(file_ds, 'SOPClassUID'):
-                    ds.SOPClassUID = file_ds.SOPClassUID
-                if hasattr(file_ds, 'InstanceNumber'):
-                    ds.InstanceNumber = str(file_ds.InstanceNumber)
-            except Exception as e:
-                logger.warning(f"Could not read DICOM file for instance {instance.sop_instance_uid}: {e}")
+        # SOPClassUID and InstanceNumber from the row, or the DICOM file for older rows
+        sop_class_uid, instance_number = file_tags
+        if sop_class_uid:
+            ds.SOPClassUID = sop_class_uid
+        if instance_number is not None:
+            ds.InstanceNumber = str(instance_number)
         
-        matches.append(ds)
+        instance_count += 1
+        yield ds
     
     # Add RT Structure Set files to matches
-    for rt_struct in rt_queryset:
+    rt_count = 0
+    for rt_struct in rt_queryset.iterator(chunk_size=QUERY_CHUNK_SIZE):
         ds = Dataset()
         
         # Set QueryRetrieveLevel - CRITICAL for retrieve operations
@@ -503,108 +457,97 @@ def _query_images(query_params, max_results=10000):
         patient = study.patient
         
         # Patient info
-        if patient.patient_id:
-            ds.PatientID = patient.patient_id
-        else:
-            ds.PatientID = ''
-            
-        if patient.patient_name:
-            ds.PatientName = patient.patient_name
-        else:
-            ds.PatientName = ''
-            
-        if patient.patient_date_of_birth:
-            ds.PatientBirthDate = patient.patient_date_of_birth.strftime('%Y%m%d')
-        else:
-            ds.PatientBirthDate = ''
-            
-        if patient.patient_gender:
-            ds.PatientSex = patient.patient_gender
-        else:
-            ds.PatientSex = ''
+        ds.PatientID = patient.patient_id or ''
+        ds.PatientName = patient.patient_name or ''
+        ds.PatientBirthDate = _format_da(patient.patient_date_of_birth) if patient.patient_date_of_birth else ''
+        ds.PatientSex = patient.patient_gender or ''
             
         # Study info - REQUIRED for retrieve operations
-        if study.study_instance_uid:
-            ds.StudyInstanceUID = study.study_instance_uid
-        else:
-            ds.StudyInstanceUID = ''
-            
-        if study.study_date:
-            ds.StudyDate = study.study_date.strftime('%Y%m%d')
-        else:
-            ds.StudyDate = ''
-            
-        if study.study_time:
-            ds.StudyTime = study.study_time.strftime('%H%M%S')
-        else:
-            ds.StudyTime = ''
-        
-        if study.study_description:
-            ds.StudyDescription = study.study_description
-        else:
-            ds.StudyDescription = ''
-            
-        if study.accession_number:
-            ds.AccessionNumber = study.accession_number
-        else:
-            ds.AccessionNumber = ''
-            
-        if study.study_id:
-            ds.StudyID = study.study_id
-        else:
-            ds.StudyID = ''
+        ds.StudyInstanceUID = study.study_instance_uid or ''
+        ds.StudyDate = _format_da(study.study_date) if study.study_date else ''
+        ds.StudyTime = _format_tm(study.study_time) if study.study_time else ''
+        ds.StudyDescription = study.study_description or ''
+        ds.AccessionNumber = study.accession_number or ''
+        ds.StudyID = study.study_id or ''
         
         # Series info - REQUIRED for retrieve operations
         # Use the RT Structure's own series instance UID
-        if rt_struct.reidentified_rt_structure_file_series_instance_uid:
-            ds.SeriesInstanceUID = rt_struct.reidentified_rt_structure_file_series_instance_uid
-        else:
-            ds.SeriesInstanceUID = ''
-            
-        if series.series_date:
-            ds.SeriesDate = series.series_date.strftime('%Y%m%d')
-        else:
-            ds.SeriesDate = ''
-            
+        ds.SeriesInstanceUID = rt_struct.reidentified_rt_structure_file_series_instance_uid or ''
+        ds.SeriesDate = _format_da(series.series_date) if series.series_date else ''
         ds.SeriesTime = ''
-        
-        if series.series_description:
-            ds.SeriesDescription = series.series_description
-        else:
-            ds.SeriesDescription = ''
-        
+        ds.SeriesDescription = series.series_description or ''
         ds.SeriesNumber = ''
         ds.Modality = 'RTSTRUCT'
         
         # Instance (IMAGE) info - REQUIRED for IMAGE level
-        if rt_struct.reidentified_rt_structure_file_sop_instance_uid:
-            ds.SOPInstanceUID = rt_struct.reidentified_rt_structure_file_sop_instance_uid
-        else:
-            ds.SOPInstanceUID = ''
+        ds.SOPInstanceUID = rt_struct.reidentified_rt_structure_file_sop_instance_uid or ''
         
         # RT Structure specific info
-        if rt_struct.reidentified_rt_structure_file_sop_class_uid:
-            ds.SOPClassUID = rt_struct.reidentified_rt_structure_file_sop_class_uid
-        else:
-            ds.SOPClassUID = '1.2.840.10008.5.1.4.1.1.481.3'  # RT Structure Set Storage
-        
+        ds.SOPClassUID = rt_struct.reidentified_rt_structure_file_sop_class_uid or '1.2.840.10008.5.1.4.1.1.481.3'  # RT Structure Set Storage
         ds.InstanceNumber = '1'
         
-        matches.append(ds)
+        rt_count += 1
+        yield ds
     
-    logger.info(f"C-FIND IMAGE level: Found {len(matches)} total matches ({len(queryset)} instances + {len(rt_queryset)} RT Structures)")
+    logger.info(f"C-FIND IMAGE level: Found {instance_count + rt_count} total matches ({instance_count} instances + {rt_count} RT Structures)")
+
+
+def _read_file_tags(instance):
+    """
+    Read SOPClassUID and InstanceNumber from an instance's DICOM file, for
+    rows registered before these values were stored on the instance.
     
-    return matches
+    Returns:
+        tuple: (sop_class_uid, instance_number), None for values that are unavailable
+    """
+    if not instance.instance_path:
+        return None, None
+    try:
+        mtime_ns = os.stat(instance.instance_path).st_mtime_ns
+        return _read_file_tags_cached(instance.instance_path, mtime_ns)
+    except FileNotFoundError:
+        return None, None
+    except Exception as e:
+        logger.warning("Could not read DICOM file for instance %s: %s", instance.sop_instance_uid, e)
+        return None, None
+
+
+@lru_cache(maxsize=4096)
+def _read_file_tags_cached(file_path, mtime_ns):
+    """
+    Read FILE_TAGS from a DICOM file. Cached per (path, mtime) so repeated
+    queries against unchanged files skip the read; a rewrite changes the mtime.
+    """
+    file_ds = dcmread(file_path, stop_before_pixels=True, specific_tags=FILE_TAGS)
+    return getattr(file_ds, 'SOPClassUID', None), getattr(file_ds, 'InstanceNumber', None)
+
+
+def _iter_with_file_tags(instances):
+    """
+    Yield (instance, file_tags) pairs, reading each batch of instance files
+    in a thread pool so file I/O for the batch overlaps. Rows that already
+    store the tags are not sent to the pool.
+    """
+    with ThreadPoolExecutor(max_workers=HEADER_READ_WORKERS, thread_name_prefix='cfind-read') as executor:
+        while True:
+            batch = list(islice(instances, HEADER_READ_BATCH_SIZE))
+            if not batch:
+                return
+            to_read = [instance for instance in batch if not instance.sop_class_uid]
+            read_tags = iter(executor.map(_read_file_tags, to_read))
+            for instance in batch:
+                if instance.sop_class_uid:
+                    yield instance, (instance.sop_class_uid, instance.instance_number)
+                else:
+                    yield instance, next(read_tags)
 
 
 def _query_series(query_params, max_results=10000):
     """
-    Query DICOMSeries model and RTStructureFileImport model and return matching DICOM datasets.
+    Query DICOMSeries model and RTStructureFileImport model and yield matching DICOM datasets.
     Includes both regular DICOM series and RT Structure Set series.
     """
-    from dicom_handler.models import DICOMSeries, RTStructureFileImport
-    
-    queryset = DICOMSeries.objects.select_related('study__patient').all()
+    queryset = DICOMSeries.objects.select_related('study__patient').only(*SERIES_QUERY_COLUMNS)
     
     # Patient level filters
     if query_params.get('PatientID'):
@@ -615,7 +558,7 @@ def _query_series(query_params, max_results=10000):
     
     # Study level filters
     if query_params.get('StudyInstanceUID'):
-        queryset = _apply_wildcard_filter(queryset, 'study__study_instance_uid', query_params['StudyInstanceUID'])
+        queryset = _apply_uid_filter(queryset, 'study__study_instance_uid', query_params['StudyInstanceUID'])
     
     if query_params.get('StudyDate'):
         queryset = _apply_date_filter(queryset, 'study__study_date', query_params['StudyDate'])
@@ -625,7 +568,7 @@ def _query_series(query_params, max_results=10000):
     
     # Series level filters
     if query_params.get('SeriesInstanceUID'):
-        queryset = _apply_wildcard_filter(queryset, 'series_instance_uid', query_params['SeriesInstanceUID'])
+        queryset = _apply_uid_filter(queryset, 'series_instance_uid', query_params['SeriesInstanceUID'])
     
     if query_params.get('SeriesDescription'):
         queryset = _apply_wildcard_filter(queryset, 'series_description', query_params['SeriesDescription'])
@@ -654,6 +597,8 @@ def _query_series(query_params, max_results=10000):
     if include_rt_structures:
         rt_queryset = RTStructureFileImport.objects.select_related(
             'deidentified_series_instance_uid__study__patient'
+        ).only(
+            *RT_STRUCT_COLUMNS, *_related_columns('deidentified_series_instance_uid', SERIES_QUERY_COLUMNS)
         ).filter(reidentified_rt_structure_file_path__isnull=False)
     else:
         rt_queryset = RTStructureFileImport.objects.none()  # Empty queryset
@@ -666,7 +611,7 @@ def _query_series(query_params, max_results=10000):
         rt_queryset = _apply_wildcard_filter(rt_queryset, 'deidentified_series_instance_uid__study__patient__patient_name', str(query_params['PatientName']))
     
     if query_params.get('StudyInstanceUID'):
-        rt_queryset = _apply_wildcard_filter(rt_queryset, 'reidentified_rt_structure_file_study_instance_uid', query_params['StudyInstanceUID'])
+        rt_queryset = _apply_uid_filter(rt_queryset, 'reidentified_rt_structure_file_study_instance_uid', query_params['StudyInstanceUID'])
     
     if query_params.get('StudyDate'):
         rt_queryset = _apply_date_filter(rt_queryset, 'deidentified_series_instance_uid__study__study_date', query_params['StudyDate'])
@@ -675,7 +620,7 @@ def _query_series(query_params, max_results=10000):
         rt_queryset = _apply_wildcard_filter(rt_queryset, 'deidentified_series_instance_uid__study__study_description', query_params['StudyDescription'])
     
     if query_params.get('SeriesInstanceUID'):
-        rt_queryset = _apply_wildcard_filter(rt_queryset, 'reidentified_rt_structure_file_series_instance_uid', query_params['SeriesInstanceUID'])
+        rt_queryset = _apply_uid_filter(rt_queryset, 'reidentified_rt_structure_file_series_instance_uid', query_params['SeriesInstanceUID'])
     
     if query_params.get('SeriesDescription'):
         rt_queryset = _apply_wildcard_filter(rt_queryset, 'deidentified_series_instance_uid__series_description', query_params['SeriesDescription'])
@@ -684,95 +629,45 @@ def _query_series(query_params, max_results=10000):
     rt_queryset = rt_queryset[:max_results]
     
     # Convert to DICOM datasets
-    matches = []
-    for series in queryset:
+    series_count = 0
+    for series in queryset.iterator(chunk_size=QUERY_CHUNK_SIZE):
+        study = series.study
+        patient = study.patient
+        
         ds = Dataset()
         
         # Set QueryRetrieveLevel - CRITICAL for retrieve operations
         ds.QueryRetrieveLevel = 'SERIES'
         
         # Patient info
-        if series.study.patient.patient_id:
-            ds.PatientID = series.study.patient.patient_id
-        else:
-            ds.PatientID = ''
-            
-        if series.study.patient.patient_name:
-            ds.PatientName = series.study.patient.patient_name
-        else:
-            ds.PatientName = ''
-            
-        if series.study.patient.patient_date_of_birth:
-            ds.PatientBirthDate = series.study.patient.patient_date_of_birth.strftime('%Y%m%d')
-        else:
-            ds.PatientBirthDate = ''
-            
-        if series.study.patient.patient_gender:
-            ds.PatientSex = series.study.patient.patient_gender
-        else:
-            ds.PatientSex = ''
+        ds.PatientID = patient.patient_id or ''
+        ds.PatientName = patient.patient_name or ''
+        ds.PatientBirthDate = _format_da(patient.patient_date_of_birth) if patient.patient_date_of_birth else ''
+        ds.PatientSex = patient.patient_gender or ''
             
         # Study info - REQUIRED for retrieve operations
-        if series.study.study_instance_uid:
-            ds.StudyInstanceUID = series.study.study_instance_uid
-        else:
-            ds.StudyInstanceUID = ''
-            
-        if series.study.study_date:
-            ds.StudyDate = series.study.study_date.strftime('%Y%m%d')
-        else:
-            ds.StudyDate = ''
-            
-        if series.study.study_time:
-            ds.StudyTime = series.study.study_time.strftime('%H%M%S')
-        else:
-            ds.StudyTime = ''
-        
-        if series.study.study_description:
-            ds.StudyDescription = series.study.study_description
-        else:
-            ds.StudyDescription = ''
-            
-        if series.study.accession_number:
-            ds.AccessionNumber = series.study.accession_number
-        else:
-            ds.AccessionNumber = ''
-            
-        if series.study.study_id:
-            ds.StudyID = series.study.study_id
-        else:
-            ds.StudyID = ''
+        ds.StudyInstanceUID = study.study_instance_uid or ''
+        ds.StudyDate = _format_da(study.study_date) if study.study_date else ''
+        ds.StudyTime = _format_tm(study.study_time) if study.study_time else ''
+        ds.StudyDescription = study.study_description or ''
+        ds.AccessionNumber = study.accession_number or ''
+        ds.StudyID = study.study_id or ''
         
         # Series info - REQUIRED for retrieve operations
-        if series.series_instance_uid:
-            ds.SeriesInstanceUID = series.series_instance_uid
-        else:
-            ds.SeriesInstanceUID = ''
-            
-        if series.series_date:
-            ds.SeriesDate = series.series_date.strftime('%Y%m%d')
-        else:
-            ds.SeriesDate = ''
-            
+        ds.SeriesInstanceUID = series.series_instance_uid or ''
+        ds.SeriesDate = _format_da(series.series_date) if series.series_date else ''
         ds.SeriesTime = ''
-        
-        if series.series_description:
-            ds.SeriesDescription = series.series_description
-        else:
-            ds.SeriesDescription = ''
-            
+        ds.SeriesDescription = series.series_description or ''
         ds.SeriesNumber = ''
         ds.Modality = ''
-        
-        if series.instance_count:
-            ds.NumberOfSeriesRelatedInstances = str(series.instance_count)
-        else:
-            ds.NumberOfSeriesRelatedInstances = '0'
+        ds.NumberOfSeriesRelatedInstances = str(series.instance_count) if series.instance_count else '0'
             
-        matches.append(ds)
+        series_count += 1
+        yield ds
     
     # Add RT Structure Set series to matches
-    for rt_struct in rt_queryset:
+    rt_count = 0
+    for rt_struct in rt_queryset.iterator(chunk_size=QUERY_CHUNK_SIZE):
         ds = Dataset()
         
         # Set QueryRetrieveLevel - CRITICAL for retrieve operations
@@ -787,88 +682,37 @@ def _query_series(query_params, max_results=10000):
         patient = study.patient
         
         # Patient info
-        if patient.patient_id:
-            ds.PatientID = patient.patient_id
-        else:
-            ds.PatientID = ''
-            
-        if patient.patient_name:
-            ds.PatientName = patient.patient_name
-        else:
-            ds.PatientName = ''
-            
-        if patient.patient_date_of_birth:
-            ds.PatientBirthDate = patient.patient_date_of_birth.strftime('%Y%m%d')
-        else:
-            ds.PatientBirthDate = ''
-            
-        if patient.patient_gender:
-            ds.PatientSex = patient.patient_gender
-        else:
-            ds.PatientSex = ''
+        ds.PatientID = patient.patient_id or ''
+        ds.PatientName = patient.patient_name or ''
+        ds.PatientBirthDate = _format_da(patient.patient_date_of_birth) if patient.patient_date_of_birth else ''
+        ds.PatientSex = patient.patient_gender or ''
             
         # Study info - REQUIRED for retrieve operations
-        if study.study_instance_uid:
-            ds.StudyInstanceUID = study.study_instance_uid
-        else:
-            ds.StudyInstanceUID = ''
-            
-        if study.study_date:
-            ds.StudyDate = study.study_date.strftime('%Y%m%d')
-        else:
-            ds.StudyDate = ''
-            
-        if study.study_time:
-            ds.StudyTime = study.study_time.strftime('%H%M%S')
-        else:
-            ds.StudyTime = ''
-        
-        if study.study_description:
-            ds.StudyDescription = study.study_description
-        else:
-            ds.StudyDescription = ''
-            
-        if study.accession_number:
-            ds.AccessionNumber = study.accession_number
-        else:
-            ds.AccessionNumber = ''
-            
-        if study.study_id:
-            ds.StudyID = study.study_id
-        else:
-            ds.StudyID = ''
+        ds.StudyInstanceUID = study.study_instance_uid or ''
+        ds.StudyDate = _format_da(study.study_date) if study.study_date else ''
+        ds.StudyTime = _format_tm(study.study_time) if study.study_time else ''
+        ds.StudyDescription = study.study_description or ''
+        ds.AccessionNumber = study.accession_number or ''
+        ds.StudyID = study.study_id or ''
         
         # Series info - REQUIRED for retrieve operations
         # Use the RT Structure's own series instance UID
-        if rt_struct.reidentified_rt_structure_file_series_instance_uid:
-            ds.SeriesInstanceUID = rt_struct.reidentified_rt_structure_file_series_instance_uid
-        else:
-            ds.SeriesInstanceUID = ''
-            
-        if series.series_date:
-            ds.SeriesDate = series.series_date.strftime('%Y%m%d')
-        else:
-            ds.SeriesDate = ''
-            
+        ds.SeriesInstanceUID = rt_struct.reidentified_rt_structure_file_series_instance_uid or ''
+        ds.SeriesDate = _format_da(series.series_date) if series.series_date else ''
         ds.SeriesTime = ''
         
         # Use RT Structure specific description or fall back to series description
-        if series.series_description:
-            ds.SeriesDescription = series.series_description
-        else:
-            ds.SeriesDescription = 'RT Structure Set'
-            
+        ds.SeriesDescription = series.series_description or 'RT Structure Set'
         ds.SeriesNumber = ''
         ds.Modality = 'RTSTRUCT'
         
         # RT Structure is typically a single instance
         ds.NumberOfSeriesRelatedInstances = '1'
             
-        matches.append(ds)
-    
-    logger.info(f"C-FIND SERIES level: Found {len(matches)} total matches ({len(queryset)} series + {len(rt_queryset)} RT Structures)")
+        rt_count += 1
+        yield ds
     
-    return matches
+    logger.info(f"C-FIND SERIES level: Found {series_count + rt_count} total matches ({series_count} series + {rt_count} RT Structures)")
 
 
 def _apply_wildcard_filter(queryset, field_name, pattern):
@@ -876,21 +720,80 @@ def _apply_wildcard_filter(queryset, field_name, pattern):
     Apply wildcard filter to Django queryset.
     Converts DICOM wildcards (* and ?) to Django ORM filters.
     """
-    import re
-    
     pattern = str(pattern)
     
     # If no wildcards, use exact match (case-insensitive)
     if '*' not in pattern and '?' not in pattern:
         return queryset.filter(**{f'{field_name}__iexact': pattern})
     
-    # Convert DICOM wildcards to Django regex
-    regex_pattern = re.escape(pattern)
-    regex_pattern = regex_pattern.replace(r'\*', '.*')  # * matches any sequence
-    regex_pattern = regex_pattern.replace(r'\?', '.')   # ? matches single char
-    regex_pattern = f'^{regex_pattern}$'
+    # Universal match - no filter needed
+    if pattern.strip('*') == '':
+        return queryset
     
-    return queryset.filter(**{f'{field_name}__iregex': regex_pattern})
+    # Leading/trailing '*' only: use LIKE lookups, which the database can
+    # plan far better than a regex
+    if '?' not in pattern:
+        core = pattern.strip('*')
+        if '*' not in core:
+            starts = pattern.startswith('*')
+            ends = pattern.endswith('*')
+            if starts and ends:
+                return queryset.filter(**{f'{field_name}__icontains': core})
+            if ends:
+                return queryset.filter(**{f'{field_name}__istartswith': core})
+            if starts:
+                return queryset.filter(**{f'{field_name}__iendswith': core})
+    
+    return queryset.filter(_UpperLike(F(field_name), _dicom_to_like(pattern)))
+
+
+class _UpperLike(Lookup):
+    """
+    Case-insensitive LIKE used for DICOM wildcard patterns that the built-in
+    istartswith/iendswith/icontains lookups cannot express.
+    """
+    lookup_name = 'upper_like'
+    
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        # Cast the column the same way the backend does for istartswith
+        # (UPPER(col::text) on PostgreSQL) so expression indexes still apply
+        lhs = connection.ops.lookup_cast('istartswith', self.lhs.output_field.get_internal_type()) % lhs
+        return f"{lhs} LIKE UPPER({rhs}) ESCAPE '\\'", [*lhs_params, *rhs_params]
+
+
+@lru_cache(maxsize=1024)
+def _dicom_to_like(pattern):
+    """
+    Convert a DICOM wildcard pattern to a LIKE pattern. Cached because
+    polling SCUs repeat the same patterns.
+    """
+    like_pattern = pattern.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    like_pattern = like_pattern.replace('*', '%')  # * matches any sequence
+    return like_pattern.replace('?', '_')          # ? matches single char
+
+
+def _apply_uid_filter(queryset, field_name, value):
+    """
+    Apply UID filter to Django queryset.
+    UIDs are matched exactly (single UID or a list of UIDs) so the indexed
+    UID columns can be used; wildcards fall back to _apply_wildcard_filter.
+    Shared with the C-GET handler so both apply the same UID matching rules.
+    """
+    uids = [value] if isinstance(value, str) else list(value)
+    uids = [str(uid) for uid in uids if uid]
+    
+    # No UIDs left (empty or blank value) is universal matching
+    if not uids:
+        return queryset
+    
+    if any('*' in uid or '?' in uid for uid in uids):
+        return _apply_wildcard_filter(queryset, field_name, value)
+    
+    if len(uids) == 1:
+        return queryset.filter(**{field_name: uids[0]})
+    return queryset.filter(**{f'{field_name}__in': uids})
 
 
 def _apply_date_filter(queryset, field_name, date_value):
@@ -898,24 +801,22 @@ def _apply_date_filter(queryset, field_name, date_value):
     Apply date filter to Django queryset.
     Supports single dates, wildcards, and ranges (YYYYMMDD-YYYYMMDD).
     """
-    from datetime import datetime
-    
     date_str = str(date_value)
     
     # Check for range query
     if '-' in date_str:
         parts = date_str.split('-')
         if len(parts) == 2:
-            start_str = parts[0] if parts[0] else '00000000'
-            end_str = parts[1] if parts[1] else '99999999'
+            start_str, end_str = parts
             
+            # Open-ended ranges ("YYYYMMDD-" / "-YYYYMMDD") only bound one side
             try:
-                start_date = datetime.strptime(start_str, '%Y%m%d').date()
-                end_date = datetime.strptime(end_str, '%Y%m%d').date()
-                return queryset.filter(**{
-                    f'{field_name}__gte': start_date,
-                    f'{field_name}__lte': end_date
-                })
+                range_filter = {}
+                if start_str:
+                    range_filter[f'{field_name}__gte'] = datetime.strptime(start_str, '%Y%m%d').date()
+                if end_str:
+                    range_filter[f'{field_name}__lte'] = datetime.strptime(end_str, '%Y%m%d').date()
+                return queryset.filter(**range_filter)
             except ValueError:
                 logger.warning(f"Invalid date range: {date_str}")
                 return queryset
@@ -931,48 +832,3 @@ def _apply_date_filter(queryset, field_name, date_value):
     except ValueError:
         logger.warning(f"Invalid date format: {date_str}")
         return queryset
-
-
-def _create_response_dataset(ds, query_level):
-    """
-    Create a response dataset based on query level.
-    """
-    response = Dataset()
-    
-    # Common attributes
-    if hasattr(ds, 'PatientID'):
-        response.PatientID = ds.PatientID
-    if hasattr(ds, 'PatientName'):
-        response.PatientName = ds.PatientName
-    if hasattr(ds, 'PatientBirthDate'):
-        response.PatientBirthDate = ds.PatientBirthDate
-    if hasattr(ds, 'PatientSex'):
-        response.PatientSex = ds.PatientSex
-    
-    # Study level attributes
-    if hasattr(ds, 'StudyInstanceUID'):
-        response.StudyInstanceUID = ds.StudyInstanceUID
-    if hasattr(ds, 'StudyDate'):
-        response.StudyDate = ds.StudyDate
-    if hasattr(ds, 'StudyTime'):
-        response.StudyTime = ds.StudyTime
-    if hasattr(ds, 'StudyDescription'):
-        response.StudyDescription = ds.StudyDescription
-    if hasattr(ds, 'AccessionNumber'):
-        response.AccessionNumber = ds.AccessionNumber
-    
-    # Series level attributes (if query level is SERIES)
-    if query_level == 'SERIES':
-        if hasattr(ds, 'SeriesInstanceUID'):
-            response.SeriesInstanceUID = ds.SeriesInstanceUID
-        if hasattr(ds, 'SeriesNumber'):
-            response.SeriesNumber = ds.SeriesNumber
-        if hasattr(ds, 'SeriesDescription'):
-            response.SeriesDescription = ds.SeriesDescription
-        if hasattr(ds, 'Modality'):
-            response.Modality = ds.Modality
-    
-    # Set query retrieve level
-    response.QueryRetrieveLevel = query_level
-    
-    return response
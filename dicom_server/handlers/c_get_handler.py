@@ -4,14 +4,34 @@ Allows remote systems to retrieve DICOM files from this SCP over the same associ
 """
 
 import logging
-import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from pydicom import dcmread
 from pydicom.dataset import Dataset
 
+from .c_find_handler import _apply_uid_filter
+
 logger = logging.getLogger(__name__)
 
+# Elements larger than this (e.g. Pixel Data) are left in the file until
+# pynetdicom encodes the C-STORE sub-operation, instead of being read up front
+DEFER_SIZE = '256 KB'
+
+# Rows fetched per database round trip while streaming C-GET matches
+MATCH_CHUNK_SIZE = 200
+
+# Compressed transfer syntaxes that are decompressed before conversion
+COMPRESSED_TRANSFER_SYNTAXES = frozenset({
+    '1.2.840.10008.1.2.4.50',  # JPEG Baseline
+    '1.2.840.10008.1.2.4.51',  # JPEG Extended
+    '1.2.840.10008.1.2.4.57',  # JPEG Lossless
+    '1.2.840.10008.1.2.4.70',  # JPEG Lossless SV1
+    '1.2.840.10008.1.2.4.90',  # JPEG 2000 Lossless
+    '1.2.840.10008.1.2.4.91',  # JPEG 2000
+    '1.2.840.10008.1.2.5',     # RLE Lossless
+})
+
 
 def handle_c_get(service, event):
     """
@@ -30,7 +50,8 @@ def handle_c_get(service, event):
     calling_ae = event.assoc.requestor.ae_title
     remote_ip = event.assoc.requestor.address
     
-    logger.info(f"C-GET request from {calling_ae} ({remote_ip})")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("C-GET request from %s (%s)", calling_ae, remote_ip)
     
     # Get the query dataset
     query_ds = event.identifier
@@ -39,51 +60,82 @@ def handle_c_get(service, event):
         # Determine query level
         query_level = getattr(query_ds, 'QueryRetrieveLevel', 'STUDY')
         
-        logger.debug(f"C-GET query level: {query_level}")
+        # Keys recorded with the transaction
+        patient_id = getattr(query_ds, 'PatientID', None)
+        study_instance_uid = getattr(query_ds, 'StudyInstanceUID', None)
+        series_instance_uid = getattr(query_ds, 'SeriesInstanceUID', None)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("C-GET query level: %s", query_level)
         
-        # Search for matching DICOM files
-        matches = _search_dicom_storage(service, query_ds, query_level)
+        # Search for matching DICOM files; the count is needed up front and
+        # the file paths are then streamed from the database
+        queryset, rt_queryset = _search_dicom_storage(service, query_ds, query_level)
+        instance_count = queryset.count()
+        rt_count = rt_queryset.count()
+        num_sub_operations = instance_count + rt_count
         
-        if not matches:
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "C-GET found %d matching files from database at %s level (%d instances + %d RT Structures)",
+                num_sub_operations, query_level, instance_count, rt_count
+            )
+        
+        if not num_sub_operations:
             logger.info("C-GET: No matches found")
             service._log_transaction(
                 'C-GET',
                 'SUCCESS',
                 event,
-                patient_id=getattr(query_ds, 'PatientID', None),
-                study_instance_uid=getattr(query_ds, 'StudyInstanceUID', None),
-                series_instance_uid=getattr(query_ds, 'SeriesInstanceUID', None)
+                patient_id=patient_id,
+                study_instance_uid=study_instance_uid,
+                series_instance_uid=series_instance_uid
             )
             # First yield must be number of sub-operations (0 for no matches)
             yield 0
             return
         
         # First yield: number of sub-operations (total files to send)
-        num_sub_operations = len(matches)
         yield num_sub_operations
         
+        # Accepted presentation contexts by SOP Class, built once per request
+        contexts_by_sop_class = {}
+        for cx in event.assoc.accepted_contexts:
+            contexts_by_sop_class.setdefault(cx.abstract_syntax, []).append(cx)
+        
         # Send files back to requestor
         success_count = 0
-        failure_count = 0
         warning_count = 0
+        failed_sop_instance_uids = []
         
-        for file_path in matches:
+        # Never stream more rows than were announced, even if rows were added
+        # after counting
+        matches = _prefetch_match_files(
+            _iter_match_files(queryset[:instance_count], rt_queryset[:rt_count])
+        )
+        for file_path, sop_instance_uid, read_future in matches:
             try:
-                # Read the DICOM file
-                ds = dcmread(file_path)
+                # The file was read in the background while the previous one was
+                # sent; a missing file is a failed sub-operation, not a failed C-GET
+                try:
+                    ds = read_future.result()
+                except FileNotFoundError:
+                    logger.warning("File not found for SOP Instance UID: %s", sop_instance_uid)
+                    failed_sop_instance_uids.append(sop_instance_uid)
+                    continue
                 
                 # Check if the requestor accepts this SOP Class and Transfer Syntax
                 # Get the accepted presentation contexts from the association
                 sop_class_uid = ds.SOPClassUID
-                current_transfer_syntax = ds.file_meta.TransferSyntaxUID if hasattr(ds, 'file_meta') else None
+                file_meta = getattr(ds, 'file_meta', None)
+                current_transfer_syntax = file_meta.TransferSyntaxUID if file_meta is not None else None
                 
                 # Find an accepted presentation context for this SOP Class
-                accepted_contexts = [cx for cx in event.assoc.accepted_contexts 
-                                   if cx.abstract_syntax == sop_class_uid]
+                accepted_contexts = contexts_by_sop_class.get(sop_class_uid)
                 
                 if not accepted_contexts:
-                    logger.warning(f"No accepted context for SOP Class {sop_class_uid}, skipping file")
-                    failure_count += 1
+                    logger.warning("No accepted context for SOP Class %s, skipping file", sop_class_uid)
+                    failed_sop_instance_uids.append(sop_instance_uid)
                     continue
                 
                 # Get the first accepted transfer syntax for this SOP Class
@@ -91,28 +143,28 @@ def handle_c_get(service, event):
                 
                 # If the file's transfer syntax doesn't match, convert it
                 if current_transfer_syntax and current_transfer_syntax != accepted_transfer_syntax:
-                    logger.debug(f"Converting from {current_transfer_syntax} to {accepted_transfer_syntax}")
-                    # Check if the dataset is compressed and needs decompression
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Converting from %s to %s", current_transfer_syntax, accepted_transfer_syntax)
+                    # Between uncompressed syntaxes only the meta changes and the pixel
+                    # data is sent as is; encoding into a compressed syntax is not
+                    # supported, so that file fails rather than being mislabelled
+                    if accepted_transfer_syntax in COMPRESSED_TRANSFER_SYNTAXES:
+                        logger.warning("Cannot convert %s to %s, skipping file", current_transfer_syntax, accepted_transfer_syntax)
+                        failed_sop_instance_uids.append(sop_instance_uid)
+                        continue
+                    
                     try:
                         # Only decompress if the current transfer syntax is compressed
-                        compressed_syntaxes = [
-                            '1.2.840.10008.1.2.4.50',  # JPEG Baseline
-                            '1.2.840.10008.1.2.4.51',  # JPEG Extended
-                            '1.2.840.10008.1.2.4.57',  # JPEG Lossless
-                            '1.2.840.10008.1.2.4.70',  # JPEG Lossless SV1
-                            '1.2.840.10008.1.2.4.90',  # JPEG 2000 Lossless
-                            '1.2.840.10008.1.2.4.91',  # JPEG 2000
-                            '1.2.840.10008.1.2.5',     # RLE Lossless
-                        ]
-                        if current_transfer_syntax in compressed_syntaxes:
+                        if current_transfer_syntax in COMPRESSED_TRANSFER_SYNTAXES:
                             ds.decompress()
-                            logger.debug(f"Decompressed dataset from {current_transfer_syntax}")
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("Decompressed dataset from %s", current_transfer_syntax)
                     except Exception as e:
-                        logger.debug(f"Decompression not needed or failed: {str(e)}")
+                        logger.debug("Decompression not needed or failed: %s", e)
                     
                     # Update the transfer syntax in file_meta
-                    if hasattr(ds, 'file_meta'):
-                        ds.file_meta.TransferSyntaxUID = accepted_transfer_syntax
+                    if file_meta is not None:
+                        file_meta.TransferSyntaxUID = accepted_transfer_syntax
                 
                 # Send the dataset back to the requestor
                 # The pynetdicom framework handles the C-STORE sub-operation
@@ -124,61 +176,72 @@ def handle_c_get(service, event):
                     elif status.Status in [0xB000, 0xB007, 0xB006]:  # Warning
                         warning_count += 1
                     else:  # Failure
-                        failure_count += 1
-                        logger.warning(f"C-STORE failed with status: {status.Status:#06x}")
+                        failed_sop_instance_uids.append(sop_instance_uid)
+                        logger.warning("C-STORE failed with status: 0x%04X", status.Status)
                 else:
                     success_count += 1
                     
             except Exception as e:
-                logger.error(f"Error sending file {file_path}: {str(e)}")
-                failure_count += 1
+                logger.error("Error sending file %s: %s", file_path, e)
+                failed_sop_instance_uids.append(sop_instance_uid)
                 # Yield failure status
                 identifier = Dataset()
                 identifier.QueryRetrieveLevel = query_level
                 yield (0xC000, identifier)
         
         # Log the transaction
+        failure_count = len(failed_sop_instance_uids)
         final_status = 'SUCCESS' if failure_count == 0 else 'FAILURE'
         service._log_transaction(
             'C-GET',
             final_status,
             event,
-            patient_id=getattr(query_ds, 'PatientID', None),
-            study_instance_uid=getattr(query_ds, 'StudyInstanceUID', None),
-            series_instance_uid=getattr(query_ds, 'SeriesInstanceUID', None)
+            patient_id=patient_id,
+            study_instance_uid=study_instance_uid,
+            series_instance_uid=series_instance_uid
         )
         
-        logger.info(f"C-GET completed: {success_count} success, {failure_count} failures, {warning_count} warnings")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "C-GET completed: %d success, %d failures, %d warnings",
+                success_count, failure_count, warning_count
+            )
+        
+        if not failure_count:
+            # Final success status
+            yield (0x0000, None)
+            return
         
-        # Final success status
-        yield (0x0000, None)
+        # Files skipped above never reached pynetdicom, so they are still counted
+        # as remaining; a Warning/Failure final status reports those as failed.
+        # Failure (0xA702) when nothing was sent, Warning (0xB000) otherwise
+        identifier = Dataset()
+        identifier.FailedSOPInstanceUIDList = [uid for uid in failed_sop_instance_uids if uid]
+        yield (0xB000 if success_count or warning_count else 0xA702, identifier)
         
     except Exception as e:
-        logger.error(f"C-GET failed: {str(e)}")
+        logger.error("C-GET failed: %s", e)
         service._log_transaction(
             'C-GET',
             'FAILURE',
             event,
             error_message=str(e)
         )
-        service.service_status.total_errors += 1
-        service.service_status.save()
+        service.increment_error_count()
         yield (0xC000, None)  # Error: Cannot understand
 
 
 def _search_dicom_storage(service, query_ds, query_level):
     """
-    Search DICOM storage using database models and return file paths.
+    Build the database querysets for files matching a C-GET request.
     Uses DICOMInstance model for accurate file tracking with SOP Instance UIDs.
     Also includes RT Structure Set files from RTStructureFileImport model.
     Supports PATIENT, STUDY, SERIES, and IMAGE query levels.
     
     Returns:
-        list: List of file paths matching the query
+        tuple: (instance_queryset, rt_queryset), each limited to max_query_results
     """
-    from dicom_handler.models import DICOMInstance, DICOMSeries, RTStructureFileImport
-    
-    matches = []
+    from dicom_handler.models import DICOMInstance, RTStructureFileImport
     
     # Get max_query_results from service config
     max_results = 10000  # Default fallback
@@ -186,7 +249,7 @@ def _search_dicom_storage(service, query_ds, query_level):
         if hasattr(service, 'config') and service.config:
             max_results = service.config.max_query_results
     except Exception as e:
-        logger.warning(f"Could not get max_query_results from config, using default: {e}")
+        logger.warning("Could not get max_query_results from config, using default: %s", e)
     
     # Extract query parameters
     patient_id = getattr(query_ds, 'PatientID', None)
@@ -194,90 +257,102 @@ def _search_dicom_storage(service, query_ds, query_level):
     series_uid = getattr(query_ds, 'SeriesInstanceUID', None)
     sop_instance_uid = getattr(query_ds, 'SOPInstanceUID', None)
     
-    try:
-        # Query database for matching instances using DICOMInstance model
-        # This provides accurate SOP Instance UID tracking
-        queryset = DICOMInstance.objects.select_related(
-            'series_instance_uid__study__patient'
-        ).all()
-        
-        # Apply filters based on query parameters and query level
-        if patient_id:
-            queryset = queryset.filter(
-                series_instance_uid__study__patient__patient_id__iexact=patient_id
-            )
-        
-        if study_uid:
-            queryset = queryset.filter(
-                series_instance_uid__study__study_instance_uid__iexact=study_uid
-            )
-        
-        if series_uid:
-            queryset = queryset.filter(
-                series_instance_uid__series_instance_uid__iexact=series_uid
-            )
-        
-        if sop_instance_uid:
-            queryset = queryset.filter(sop_instance_uid__iexact=sop_instance_uid)
-        
-        # Limit results based on query level to prevent overwhelming the system
-        queryset = queryset[:max_results]
-        
-        # Collect file paths from instances
-        for instance in queryset:
-            if instance.instance_path and os.path.exists(instance.instance_path):
-                matches.append(instance.instance_path)
-            else:
-                logger.warning(f"File not found for SOP Instance UID: {instance.sop_instance_uid}")
-        
-        # Also query RT Structure files using database relationships
-        rt_queryset = RTStructureFileImport.objects.select_related(
-            'deidentified_series_instance_uid__study__patient'
-        ).filter(reidentified_rt_structure_file_path__isnull=False)
-        
-        # Apply filters to RT Structure files
-        # Use the deidentified_series_instance_uid relationship to access patient/study data
-        # but match against reidentified UIDs for series/SOP instance
-        
-        if patient_id:
-            # Filter by patient_id through the series relationship
-            rt_queryset = rt_queryset.filter(
-                deidentified_series_instance_uid__study__patient__patient_id__iexact=patient_id
-            )
-        
-        if study_uid:
-            # Use reidentified study UID for filtering
-            rt_queryset = rt_queryset.filter(
-                reidentified_rt_structure_file_study_instance_uid__iexact=study_uid
-            )
-        
-        if series_uid:
-            # Use reidentified series UID for filtering
-            rt_queryset = rt_queryset.filter(
-                reidentified_rt_structure_file_series_instance_uid__iexact=series_uid
-            )
-        
-        if sop_instance_uid:
-            # Use reidentified SOP instance UID for filtering
-            rt_queryset = rt_queryset.filter(
-                reidentified_rt_structure_file_sop_instance_uid__iexact=sop_instance_uid
-            )
-        
-        # Limit RT Structure results
-        rt_queryset = rt_queryset[:max_results]
-        
-        # Collect file paths from RT Structure files
-        for rt_struct in rt_queryset:
-            if rt_struct.reidentified_rt_structure_file_path and os.path.exists(rt_struct.reidentified_rt_structure_file_path):
-                matches.append(rt_struct.reidentified_rt_structure_file_path)
-            else:
-                logger.warning(f"RT Structure file not found for SOP Instance UID: {rt_struct.reidentified_rt_structure_file_sop_instance_uid}")
-        
-        logger.info(f"C-GET found {len(matches)} matching files from database at {query_level} level ({len(queryset)} instances + {len(rt_queryset)} RT Structures)")
-        return matches
-        
-    except Exception as e:
-        logger.error(f"Error querying database for C-GET: {str(e)}")
-        return []
+    # Query database for matching instances using DICOMInstance model
+    # This provides accurate SOP Instance UID tracking
+    queryset = DICOMInstance.objects.all()
+    
+    # Apply filters based on query parameters and query level
+    if patient_id:
+        queryset = queryset.filter(
+            series_instance_uid__study__patient__patient_id=patient_id
+        )
+    
+    if study_uid:
+        queryset = _apply_uid_filter(
+            queryset, 'series_instance_uid__study__study_instance_uid', study_uid
+        )
+    
+    if series_uid:
+        queryset = _apply_uid_filter(
+            queryset, 'series_instance_uid__series_instance_uid', series_uid
+        )
+    
+    if sop_instance_uid:
+        queryset = _apply_uid_filter(queryset, 'sop_instance_uid', sop_instance_uid)
+    
+    # Also query RT Structure files using database relationships
+    rt_queryset = RTStructureFileImport.objects.filter(
+        reidentified_rt_structure_file_path__isnull=False
+    )
+    
+    # Apply filters to RT Structure files
+    # Use the deidentified_series_instance_uid relationship to access patient/study data
+    # but match against reidentified UIDs for series/SOP instance
+    
+    if patient_id:
+        # Filter by patient_id through the series relationship
+        rt_queryset = rt_queryset.filter(
+            deidentified_series_instance_uid__study__patient__patient_id=patient_id
+        )
+    
+    if study_uid:
+        # Use reidentified study UID for filtering
+        rt_queryset = _apply_uid_filter(
+            rt_queryset, 'reidentified_rt_structure_file_study_instance_uid', study_uid
+        )
+    
+    if series_uid:
+        # Use reidentified series UID for filtering
+        rt_queryset = _apply_uid_filter(
+            rt_queryset, 'reidentified_rt_structure_file_series_instance_uid', series_uid
+        )
+    
+    if sop_instance_uid:
+        # Use reidentified SOP instance UID for filtering
+        rt_queryset = _apply_uid_filter(
+            rt_queryset, 'reidentified_rt_structure_file_sop_instance_uid', sop_instance_uid
+        )
+    
+    # Only the file path and SOP Instance UID are needed to send each file.
+    # A fixed order makes the count and the streamed rows cover the same rows
+    # when the result is truncated to max_results.
+    queryset = queryset.order_by('pk').values_list('instance_path', 'sop_instance_uid')
+    rt_queryset = rt_queryset.order_by('pk').values_list(
+        'reidentified_rt_structure_file_path',
+        'reidentified_rt_structure_file_sop_instance_uid'
+    )
+    
+    # Limit results to prevent overwhelming the system
+    return queryset[:max_results], rt_queryset[:max_results]
 
 
+def _iter_match_files(queryset, rt_queryset):
+    """
+    Yield (file_path, sop_instance_uid) for matched instances and RT Structure
+    files, streaming rows from the database in chunks.
+    """
+    yield from queryset.iterator(chunk_size=MATCH_CHUNK_SIZE)
+    yield from rt_queryset.iterator(chunk_size=MATCH_CHUNK_SIZE)
+
+
+def _read_match_file(file_path):
+    """Read a matched DICOM file, deferring bulk data until it is sent."""
+    if not file_path:
+        raise FileNotFoundError(file_path)
+    return dcmread(file_path, defer_size=DEFER_SIZE)
+
+
+def _prefetch_match_files(matches):
+    """
+    Yield (file_path, sop_instance_uid, future) for each match, reading the
+    next file on a background thread while the current one is being sent.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = None
+        for file_path, sop_instance_uid in matches:
+            future = executor.submit(_read_match_file, file_path)
+            if pending is not None:
+                yield pending
+            pending = (file_path, sop_instance_uid, future)
+        if pending is not None:
+            yield pending
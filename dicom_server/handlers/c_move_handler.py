@@ -148,8 +148,7 @@ def handle_c_move(service, event):
             event,
             error_message=str(e)
         )
-        service.service_status.total_errors += 1
-        service.service_status.save()
+        service.increment_error_count()
         yield (0xC000, None)  # Error: Cannot understand
 
 
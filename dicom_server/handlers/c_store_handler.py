@@ -16,6 +16,7 @@ from django.db import transaction as db_transaction
 from django.core.cache import cache
 
 from ..models import DicomTransaction
+from ..dicom_scp_service import get_cached_server_config, get_cached_system_config
 from ..storage_cleanup import check_and_cleanup_if_needed, get_storage_usage
 from dicom_handler.models import SystemConfiguration
 
@@ -117,6 +118,10 @@ def handle_c_store(service, event):
         sop_instance_uid = None
         sop_class_uid = None
         
+        # Encode once: the same bytes (preamble, file meta and raw dataset as
+        # received) are decoded below when needed and written to disk as-is
+        encoded_data = event.encoded_dataset()
+        
         # Check if we need to decode the dataset
         needs_decoding = (
             fresh_config.validate_dicom_on_receive or
@@ -127,16 +132,10 @@ def handle_c_store(service, event):
         if needs_decoding:
             # Decode dataset only when necessary
             logger.info(f"[TIMING] Needs decoding check took {(time.time() - t4)*1000:.2f}ms")
-            t5 = time.time()
             
-            # CRITICAL FIX: Access event.encoded_dataset() first to trigger efficient byte reception
-            # Then decode from bytes, which is much faster than event.dataset property
-            from pydicom import dcmread
+            # Decode from the encoded bytes, which is much faster than event.dataset property
             from io import BytesIO
             
-            encoded_data = event.encoded_dataset()
-            logger.info(f"[TIMING] Received encoded data ({len(encoded_data)} bytes) in {(time.time() - t5)*1000:.2f}ms")
-            
             t5b = time.time()
             ds = dcmread(BytesIO(encoded_data), force=True)
             ds.file_meta = event.file_meta
@@ -209,10 +208,10 @@ def handle_c_store(service, event):
         t9 = time.time()
         with open(file_path, 'wb') as f:
             # Write preamble, prefix, file meta information and raw dataset
-            f.write(event.encoded_dataset())
+            f.write(encoded_data)
         logger.info(f"[TIMING] File write took {(time.time() - t9)*1000:.2f}ms")
         
-        file_size = os.path.getsize(file_path)
+        file_size = len(encoded_data)
         
         # Calculate transfer speed
         duration = time.time() - start_time
@@ -255,9 +254,15 @@ def handle_c_store(service, event):
         # for performance. Storage usage will be slightly stale but accurate enough.
         
         # Trigger DICOM Handler integration for immediate processing (when ds is available)
-        # This enables immediate processing for C-Store requests, bypassing the 10-minute delay
+        # This enables immediate processing for C-Store requests, bypassing the 10-minute delay.
+        # Runs on the service's post-store worker so the response is not held up by it;
+        # only the path is queued and the worker re-reads the headers, so queued work
+        # does not keep decoded pixel data in memory.
         if ds is not None:
-            _trigger_dicom_handler_integration(service, file_path, ds, calling_ae)
+            service.submit_post_store(
+                _trigger_dicom_handler_integration, service, file_path, calling_ae,
+                key=calling_ae
+            )
         else:
             logger.debug("[C-STORE] Skipping immediate processing trigger - DICOM dataset not decoded")
         
@@ -399,10 +404,9 @@ def _get_storage_path(service, ds, fresh_config=None):
     """
     # Get base path from SystemConfiguration and fresh config for structure
     try:
-        from ..models import DicomServerConfig
-        system_config = SystemConfiguration.objects.get(pk=1)
+        system_config = get_cached_system_config()
         if fresh_config is None:
-            fresh_config = DicomServerConfig.objects.get(pk=1)
+            fresh_config = get_cached_server_config()
         base_path = system_config.folder_configuration
     except:
         base_path = '/app/datastore'  # Fallback
@@ -452,9 +456,8 @@ def _get_filename(service, ds, fresh_config=None):
     """
     # Get fresh config for naming convention
     try:
-        from ..models import DicomServerConfig
         if fresh_config is None:
-            fresh_config = DicomServerConfig.objects.get(pk=1)
+            fresh_config = get_cached_server_config()
         naming = fresh_config.file_naming_convention
     except:
         naming = service.config.file_naming_convention if service.config else 'timestamp'
@@ -685,7 +688,7 @@ def _process_cstore_file_to_database(file_path, ds, ae_title=None):
     
     Args:
         file_path: Path to the saved DICOM file
-        ds: DICOM dataset (already decoded by handle_c_store)
+        ds: DICOM dataset headers (read without pixel data)
         ae_title: The calling AE Title (for series tracking)
     
     Returns:
@@ -733,6 +736,11 @@ def _process_cstore_file_to_database(file_path, ds, ae_title=None):
         series_description = getattr(ds, 'SeriesDescription', '')
         frame_of_reference_uid = getattr(ds, 'FrameOfReferenceUID', '')
         sop_instance_uid = getattr(ds, 'SOPInstanceUID', '')
+        sop_class_uid = getattr(ds, 'SOPClassUID', '')
+        try:
+            instance_number = int(getattr(ds, 'InstanceNumber', None))
+        except (TypeError, ValueError):
+            instance_number = None
         
         # Track series reception and trigger Task2 if previous series is complete
         tracking_result = None
@@ -826,6 +834,8 @@ def _process_cstore_file_to_database(file_path, ds, ae_title=None):
             DICOMInstance.objects.create(
                 series_instance_uid=series,
                 sop_instance_uid=sop_instance_uid,
+                sop_class_uid=sop_class_uid,
+                instance_number=instance_number,
                 instance_path=file_path
             )
             
@@ -854,7 +864,7 @@ def _process_cstore_file_to_database(file_path, ds, ae_title=None):
         return {"status": "error", "message": str(e)}
 
 
-def _trigger_dicom_handler_integration(service, file_path, ds, ae_title=None):
+def _trigger_dicom_handler_integration(service, file_path, ae_title=None):
     """
     Trigger integration with DICOM Handler processing chain.
     
@@ -864,13 +874,17 @@ def _trigger_dicom_handler_integration(service, file_path, ds, ae_title=None):
     """
     try:
         # Get fresh config for handler integration settings
-        from ..models import DicomServerConfig
-        fresh_config = DicomServerConfig.objects.get(pk=1)
+        fresh_config = service.get_fresh_config()
+        
+        if not (fresh_config.copy_to_handler_folder or fresh_config.trigger_processing_chain):
+            return
+        
+        # Only header tags are needed here
+        ds = dcmread(file_path, stop_before_pixels=True)
         
         if fresh_config.copy_to_handler_folder:
             # Copy file to DICOM Handler folder
-            from dicom_handler.models import SystemConfiguration
-            system_config = SystemConfiguration.objects.get(pk=1)
+            system_config = get_cached_system_config()
             handler_folder = system_config.folder_configuration
             
             if handler_folder and os.path.exists(handler_folder):
@@ -0,0 +1,90 @@
+"""
+Management command to backfill SOP Class UID and Instance Number on DICOM instances.
+Instances registered before these columns existed have them empty, which makes
+IMAGE-level C-FIND fall back to reading each file. This command reads the two
+tags once and stores them on the instance rows.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from pydicom import dcmread
+
+from dicom_handler.models import DICOMInstance
+
+
+def _read_instance_tags(instance):
+    """Read SOPClassUID and InstanceNumber from an instance's file."""
+    try:
+        file_ds = dcmread(
+            instance.instance_path,
+            stop_before_pixels=True,
+            specific_tags=['SOPClassUID', 'InstanceNumber'],
+        )
+    except Exception:
+        return None, None
+    try:
+        instance_number = int(getattr(file_ds, 'InstanceNumber', None))
+    except (TypeError, ValueError):
+        instance_number = None
+    return getattr(file_ds, 'SOPClassUID', None), instance_number
+
+
+class Command(BaseCommand):
+    help = 'Backfill SOP Class UID and Instance Number on DICOM instances from their files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of instances read and updated per batch',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of threads used to read DICOM files',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        queryset = DICOMInstance.objects.filter(
+            sop_class_uid__isnull=True,
+            instance_path__isnull=False,
+        ).only('id', 'instance_path')
+
+        self.stdout.write(f'Backfilling {queryset.count()} DICOM instances...')
+
+        updated = 0
+        unreadable = 0
+        last_pk = None
+
+        # Page by primary key rather than holding a cursor open on the table being updated
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                page = queryset.order_by('pk')
+                if last_pk is not None:
+                    page = page.filter(pk__gt=last_pk)
+                batch = list(page[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+
+                to_update = []
+                for instance, (sop_class_uid, instance_number) in zip(batch, executor.map(_read_instance_tags, batch)):
+                    if not sop_class_uid:
+                        unreadable += 1
+                        continue
+                    instance.sop_class_uid = sop_class_uid
+                    instance.instance_number = instance_number
+                    to_update.append(instance)
+
+                DICOMInstance.objects.bulk_update(to_update, ['sop_class_uid', 'instance_number'])
+                updated += len(to_update)
+
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} DICOM instances'))
+        if unreadable:
+            self.stdout.write(self.style.WARNING(
+                f'{unreadable} instances could not be read and were left unchanged'
+            ))
@@ -12,6 +12,24 @@ from pathlib import Path
 logger = logging.getLogger(__name__)
 
 
+def _iter_dicom_files(path):
+    """
+    Recursively yield os.DirEntry objects for .dcm files under path.
+    
+    Uses os.scandir so file names are filtered without a stat call per entry,
+    and DirEntry.stat() results are cached on the entry.
+    """
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_dicom_files(entry.path)
+                elif entry.name.endswith('.dcm'):
+                    yield entry
+    except OSError as e:
+        logger.error(f"Error scanning directory {path}: {str(e)}")
+
+
 def cleanup_old_files(storage_path, retention_days, target_free_gb=10):
     """
     Clean up old files from storage to free up space.
@@ -44,20 +62,17 @@ def cleanup_old_files(storage_path, retention_days, target_free_gb=10):
     
     # Collect all DICOM files with their modification times
     file_list = []
-    for root, dirs, files in os.walk(storage_path):
-        for filename in files:
-            if filename.endswith('.dcm'):
-                filepath = os.path.join(root, filename)
-                try:
-                    file_stat = os.stat(filepath)
-                    file_list.append({
-                        'path': filepath,
-                        'mtime': file_stat.st_mtime,
-                        'size': file_stat.st_size
-                    })
-                except Exception as e:
-                    logger.error(f"Error accessing file {filepath}: {str(e)}")
-                    stats['errors'] += 1
+    for entry in _iter_dicom_files(storage_path):
+        try:
+            file_stat = entry.stat()
+            file_list.append({
+                'path': entry.path,
+                'mtime': file_stat.st_mtime,
+                'size': file_stat.st_size
+            })
+        except Exception as e:
+            logger.error(f"Error accessing file {entry.path}: {str(e)}")
+            stats['errors'] += 1
     
     # Sort by modification time (oldest first)
     file_list.sort(key=lambda x: x['mtime'])
@@ -134,15 +149,12 @@ def get_storage_usage(storage_path):
     if not os.path.exists(storage_path):
         return stats
     
-    for root, dirs, files in os.walk(storage_path):
-        for filename in files:
-            if filename.endswith('.dcm'):
-                filepath = os.path.join(root, filename)
-                try:
-                    stats['total_files'] += 1
-                    stats['total_bytes'] += os.path.getsize(filepath)
-                except Exception as e:
-                    logger.error(f"Error accessing file {filepath}: {str(e)}")
+    for entry in _iter_dicom_files(storage_path):
+        try:
+            stats['total_files'] += 1
+            stats['total_bytes'] += entry.stat().st_size
+        except Exception as e:
+            logger.error(f"Error accessing file {entry.path}: {str(e)}")
     
     stats['total_gb'] = round(stats['total_bytes'] / (1024**3), 2)
     
@@ -35,6 +35,33 @@ def log_dicom_transaction_async(transaction_data):
         raise
 
 
+@shared_task(ignore_result=True, max_retries=3, default_retry_delay=1)
+def log_dicom_transactions_bulk_async(transactions_data):
+    """
+    Asynchronously log a batch of DICOM transactions with a single bulk insert.
+    
+    The SCP service collects transactions in memory and sends them here in
+    batches, so one broker message and one INSERT cover many DICOM events.
+    
+    Args:
+        transactions_data (list): List of transaction data dicts
+        
+    Returns:
+        None (ignore_result=True for performance)
+    """
+    try:
+        from .models import DicomTransaction
+        DicomTransaction.objects.bulk_create(
+            [DicomTransaction(**data) for data in transactions_data],
+            batch_size=500
+        )
+        logger.debug(f"Logged {len(transactions_data)} transactions async")
+    except Exception as e:
+        logger.error(f"Failed to bulk log transactions async: {str(e)}")
+        # Retry on database errors
+        raise
+
+
 @shared_task(ignore_result=True, max_retries=3, default_retry_delay=1)
 def update_service_status_async(status_updates):
     """
@@ -362,3 +362,374 @@ class DicomFileMetadataTestCase(TestCase):
         self.assertEqual(ds.SeriesInstanceUID, '1.2.3.4.5.6')
         self.assertEqual(ds.Modality, 'CT')
         self.assertEqual(ds.SeriesDescription, 'Axial CT')
+
+
+class CFindQueryTestCase(TestCase):
+    """Test C-FIND database queries."""
+    
+    def setUp(self):
+        """Set up test data."""
+        from dicom_handler.models import Patient, DICOMStudy, DICOMSeries, DICOMInstance
+        
+        self.patient = Patient.objects.create(
+            patient_id='CF12345',
+            patient_name='Find^Test',
+            patient_gender='F',
+            patient_date_of_birth=datetime.date(1985, 3, 15)
+        )
+        self.studies = []
+        for i in range(2):
+            study = DICOMStudy.objects.create(
+                patient=self.patient,
+                study_instance_uid=f'1.2.826.0.1.{i}',
+                study_date=datetime.date(2026, 1, 3 + i),
+                study_description=f'CT Chest {i}',
+                accession_number=f'ACC00{i}'
+            )
+            series = DICOMSeries.objects.create(
+                study=study,
+                series_instance_uid=f'1.2.826.0.1.{i}.1',
+                series_description='Axial',
+                instance_count=2
+            )
+            for j in range(2):
+                DICOMInstance.objects.create(
+                    series_instance_uid=series,
+                    sop_instance_uid=f'1.2.826.0.1.{i}.1.{j}'
+                )
+            self.studies.append(study)
+    
+    def test_study_query_by_uid(self):
+        """Test STUDY level query matches a single Study Instance UID."""
+        from dicom_server.handlers.c_find_handler import _query_studies
+        
+        matches = list(_query_studies({'StudyInstanceUID': '1.2.826.0.1.1'}))
+        
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].StudyInstanceUID, '1.2.826.0.1.1')
+        self.assertEqual(matches[0].PatientID, 'CF12345')
+    
+    def test_study_query_by_uid_list(self):
+        """Test STUDY level query matches a list of Study Instance UIDs."""
+        from dicom_server.handlers.c_find_handler import _query_studies
+        
+        matches = list(_query_studies({'StudyInstanceUID': ['1.2.826.0.1.0', '1.2.826.0.1.1']}))
+        
+        self.assertEqual(
+            sorted(m.StudyInstanceUID for m in matches),
+            ['1.2.826.0.1.0', '1.2.826.0.1.1']
+        )
+    
+    def test_patient_id_wildcard_patterns(self):
+        """Test PatientID wildcard patterns, including ones translated to LIKE."""
+        from dicom_server.handlers.c_find_handler import _query_patients, _query_studies
+        
+        for pattern in ('CF*', '*12345', '*F123*', 'cf*', 'CF?2345', 'cf?23*5', 'C*5', '*'):
+            with self.subTest(pattern=pattern):
+                matches = list(_query_patients({'PatientID': pattern}))
+                self.assertEqual([m.PatientID for m in matches], ['CF12345'])
+        
+        # SQL LIKE metacharacters in the pattern are matched literally
+        for pattern in ('XCF*', 'C%5', 'C_12345', 'C%?2345'):
+            with self.subTest(pattern=pattern):
+                self.assertEqual(list(_query_patients({'PatientID': pattern})), [])
+        
+        self.assertEqual(len(list(_query_studies({'PatientID': 'C?1*5'}))), 2)
+    
+    def test_study_query_counts_instances_in_one_query(self):
+        """Test NumberOfStudyRelatedInstances is aggregated without per-study queries."""
+        from dicom_server.handlers.c_find_handler import _query_studies
+        
+        with self.assertNumQueries(1):
+            matches = list(_query_studies({'PatientID': 'CF12345'}))
+        
+        self.assertEqual(len(matches), 2)
+        self.assertEqual([m.NumberOfStudyRelatedInstances for m in matches], ['2', '2'])
+    
+    def test_series_and_image_queries_load_rows_once(self):
+        """Test SERIES/IMAGE responses are built without loading deferred columns."""
+        from dicom_server.handlers.c_find_handler import _query_series, _query_images
+        
+        # One query for the DICOM rows and one for RT Structure files
+        with self.assertNumQueries(2):
+            series_matches = list(_query_series({'PatientID': 'CF12345'}))
+        with self.assertNumQueries(2):
+            image_matches = list(_query_images({'PatientID': 'CF12345'}))
+        
+        self.assertEqual(len(series_matches), 2)
+        self.assertEqual(len(image_matches), 4)
+        self.assertEqual(image_matches[0].PatientID, 'CF12345')
+    
+    def test_study_query_by_open_date_range(self):
+        """Test STUDY level query with open-ended StudyDate ranges."""
+        from dicom_server.handlers.c_find_handler import _query_studies
+        
+        matches = list(_query_studies({'StudyDate': '20260104-'}))
+        self.assertEqual([m.StudyInstanceUID for m in matches], ['1.2.826.0.1.1'])
+        
+        matches = list(_query_studies({'StudyDate': '-20260103'}))
+        self.assertEqual([m.StudyInstanceUID for m in matches], ['1.2.826.0.1.0'])
+    
+    def test_series_query_by_study_uid(self):
+        """Test SERIES level query filtered by Study Instance UID."""
+        from dicom_server.handlers.c_find_handler import _query_series
+        
+        matches = list(_query_series({'StudyInstanceUID': '1.2.826.0.1.0'}))
+        
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].SeriesInstanceUID, '1.2.826.0.1.0.1')
+        self.assertEqual(matches[0].NumberOfSeriesRelatedInstances, '2')
+    
+    def test_image_query_reads_file_tags(self):
+        """Test IMAGE level query fills SOPClassUID/InstanceNumber from the instance file."""
+        from dicom_handler.models import DICOMInstance
+        from dicom_server.handlers.c_find_handler import _query_images
+        
+        instance = DICOMInstance.objects.get(sop_instance_uid='1.2.826.0.1.0.1.0')
+        file_path = os.path.join(tempfile.mkdtemp(), 'instance.dcm')
+        file_meta = Dataset()
+        file_meta.MediaStorageSOPClassUID = CTImageStorage
+        file_meta.MediaStorageSOPInstanceUID = instance.sop_instance_uid
+        file_meta.TransferSyntaxUID = '1.2.840.10008.1.2.1'
+        ds = FileDataset(file_path, {}, file_meta=file_meta, preamble=b"\0" * 128)
+        ds.SOPClassUID = CTImageStorage
+        ds.SOPInstanceUID = instance.sop_instance_uid
+        ds.InstanceNumber = 7
+        ds.save_as(file_path, enforce_file_format=True)
+        instance.instance_path = file_path
+        instance.save()
+        
+        matches = list(_query_images({'SeriesInstanceUID': '1.2.826.0.1.0.1', 'Modality': 'CT'}))
+        
+        self.assertEqual(len(matches), 2)
+        by_uid = {m.SOPInstanceUID: m for m in matches}
+        self.assertEqual(by_uid['1.2.826.0.1.0.1.0'].SOPClassUID, CTImageStorage)
+        self.assertEqual(by_uid['1.2.826.0.1.0.1.0'].InstanceNumber, '7')
+        self.assertNotIn('SOPClassUID', by_uid['1.2.826.0.1.0.1.1'])
+    
+    def test_image_query_uses_stored_tags(self):
+        """Test IMAGE level query uses SOPClassUID/InstanceNumber stored on the instance row."""
+        from dicom_handler.models import DICOMInstance
+        from dicom_server.handlers.c_find_handler import _query_images
+        
+        DICOMInstance.objects.filter(sop_instance_uid='1.2.826.0.1.0.1.1').update(
+            sop_class_uid=CTImageStorage,
+            instance_number=3,
+            instance_path='/nonexistent/instance.dcm'
+        )
+        
+        matches = list(_query_images({'SOPInstanceUID': '1.2.826.0.1.0.1.1'}))
+        
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].SOPClassUID, CTImageStorage)
+        self.assertEqual(matches[0].InstanceNumber, '3')
+    
+    def test_search_streams_matches(self):
+        """Test C-FIND search yields matches lazily."""
+        import types
+        from dicom_server.handlers.c_find_handler import _search_dicom_storage
+        
+        query_ds = Dataset()
+        query_ds.QueryRetrieveLevel = 'STUDY'
+        query_ds.PatientID = 'CF12345'
+        
+        matches = _search_dicom_storage(types.SimpleNamespace(config=None), query_ds, 'STUDY')
+        
+        self.assertIsInstance(matches, types.GeneratorType)
+        self.assertEqual(len(list(matches)), 2)
+    
+    def test_search_ignores_universal_match_keys(self):
+        """Test '*' matching keys do not filter out any results."""
+        import types
+        from dicom_server.handlers.c_find_handler import _search_dicom_storage
+        
+        query_ds = Dataset()
+        query_ds.QueryRetrieveLevel = 'STUDY'
+        query_ds.PatientID = 'CF12345'
+        query_ds.PatientName = '*'
+        query_ds.StudyDate = '*'
+        query_ds.AccessionNumber = '**'
+        
+        matches = list(_search_dicom_storage(types.SimpleNamespace(config=None), query_ds, 'STUDY'))
+        
+        self.assertEqual(len(matches), 2)
+    
+    def test_search_respects_max_query_results(self):
+        """Test C-FIND results are capped at max_query_results with a warning."""
+        import types
+        from dicom_server.handlers.c_find_handler import _search_dicom_storage
+        
+        query_ds = Dataset()
+        query_ds.QueryRetrieveLevel = 'STUDY'
+        query_ds.PatientID = 'CF12345'
+        service = types.SimpleNamespace(config=types.SimpleNamespace(max_query_results=1))
+        
+        with self.assertLogs('dicom_server.handlers.c_find_handler', level='WARNING'):
+            matches = list(_search_dicom_storage(service, query_ds, 'STUDY'))
+        
+        self.assertEqual(len(matches), 1)
+
+
+class CGetRetrieveTestCase(TestCase):
+    """Test C-GET retrieval from the database-backed storage."""
+    
+    def setUp(self):
+        """Set up test data."""
+        from dicom_handler.models import Patient, DICOMStudy, DICOMSeries, DICOMInstance
+        
+        patient = Patient.objects.create(patient_id='CG12345', patient_name='Get^Test')
+        study = DICOMStudy.objects.create(patient=patient, study_instance_uid='1.2.826.0.2.1')
+        series = DICOMSeries.objects.create(
+            study=study,
+            series_instance_uid='1.2.826.0.2.1.1',
+            instance_count=2
+        )
+        
+        self.file_path = os.path.join(tempfile.mkdtemp(), 'instance.dcm')
+        file_meta = Dataset()
+        file_meta.MediaStorageSOPClassUID = CTImageStorage
+        file_meta.MediaStorageSOPInstanceUID = '1.2.826.0.2.1.1.0'
+        file_meta.TransferSyntaxUID = '1.2.840.10008.1.2.1'
+        ds = FileDataset(self.file_path, {}, file_meta=file_meta, preamble=b"\0" * 128)
+        ds.SOPClassUID = CTImageStorage
+        ds.SOPInstanceUID = '1.2.826.0.2.1.1.0'
+        ds.PatientID = 'CG12345'
+        ds.save_as(self.file_path, enforce_file_format=True)
+        
+        DICOMInstance.objects.create(
+            series_instance_uid=series,
+            sop_instance_uid='1.2.826.0.2.1.1.0',
+            instance_path=self.file_path
+        )
+        DICOMInstance.objects.create(
+            series_instance_uid=series,
+            sop_instance_uid='1.2.826.0.2.1.1.1',
+            instance_path=os.path.join(tempfile.mkdtemp(), 'missing.dcm')
+        )
+    
+    def _get_event(self, **identifier):
+        """Build a minimal C-GET event accepting CT Image Storage."""
+        import types
+        
+        query_ds = Dataset()
+        query_ds.QueryRetrieveLevel = 'SERIES'
+        for keyword, value in identifier.items():
+            setattr(query_ds, keyword, value)
+        
+        context = types.SimpleNamespace(
+            abstract_syntax=CTImageStorage,
+            transfer_syntax=['1.2.840.10008.1.2.1']
+        )
+        requestor = types.SimpleNamespace(ae_title='GET_SCU', address='127.0.0.1', port=11113)
+        assoc = types.SimpleNamespace(requestor=requestor, accepted_contexts=[context])
+        return types.SimpleNamespace(assoc=assoc, identifier=query_ds)
+    
+    def test_c_get_streams_matching_files(self):
+        """Test C-GET announces all matches and sends the files that exist."""
+        import types
+        from unittest import mock
+        from dicom_server.handlers.c_get_handler import handle_c_get
+        
+        service = types.SimpleNamespace(
+            config=None,
+            _log_transaction=mock.Mock(),
+            increment_error_count=mock.Mock()
+        )
+        event = self._get_event(SeriesInstanceUID='1.2.826.0.2.1.1')
+        
+        responses = list(handle_c_get(service, event))
+        
+        self.assertEqual(responses[0], 2)
+        self.assertEqual(len(responses), 3)
+        status, ds = responses[1]
+        self.assertEqual(status, 0xFF00)
+        self.assertEqual(ds.SOPInstanceUID, '1.2.826.0.2.1.1.0')
+        
+        # The missing file is reported as failed rather than ending in Success
+        status, identifier = responses[2]
+        self.assertEqual(status, 0xB000)
+        self.assertEqual(identifier.FailedSOPInstanceUIDList, '1.2.826.0.2.1.1.1')
+        self.assertEqual(service._log_transaction.call_args[0][1], 'FAILURE')
+    
+    def test_c_get_without_matches(self):
+        """Test C-GET with no matching instances yields zero sub-operations."""
+        import types
+        from unittest import mock
+        from dicom_server.handlers.c_get_handler import handle_c_get
+        
+        service = types.SimpleNamespace(
+            config=None,
+            _log_transaction=mock.Mock(),
+            increment_error_count=mock.Mock()
+        )
+        event = self._get_event(SeriesInstanceUID='9.9.9')
+        
+        self.assertEqual(list(handle_c_get(service, event)), [0])
+    
+    def test_search_returns_paths_without_joins(self):
+        """Test C-GET search only selects file paths and SOP Instance UIDs."""
+        import types
+        from dicom_server.handlers.c_get_handler import _search_dicom_storage
+        
+        query_ds = Dataset()
+        query_ds.SOPInstanceUID = '1.2.826.0.2.1.1.0'
+        queryset, rt_queryset = _search_dicom_storage(
+            types.SimpleNamespace(config=None), query_ds, 'IMAGE'
+        )
+        
+        self.assertNotIn('JOIN', str(queryset.query))
+        self.assertIn('ORDER BY', str(queryset.query))
+        self.assertEqual(list(queryset), [(self.file_path, '1.2.826.0.2.1.1.0')])
+        self.assertEqual(list(rt_queryset), [])
+    
+    def test_c_get_does_not_relabel_as_compressed(self):
+        """Test C-GET fails a file that would need encoding into a compressed syntax."""
+        import types
+        from unittest import mock
+        from dicom_server.handlers.c_get_handler import handle_c_get
+        
+        service = types.SimpleNamespace(
+            config=None,
+            _log_transaction=mock.Mock(),
+            increment_error_count=mock.Mock()
+        )
+        event = self._get_event(SOPInstanceUID='1.2.826.0.2.1.1.0')
+        event.assoc.accepted_contexts[0].transfer_syntax = ['1.2.840.10008.1.2.4.50']
+        
+        responses = list(handle_c_get(service, event))
+        
+        self.assertEqual(responses[0], 1)
+        status, identifier = responses[1]
+        self.assertEqual(status, 0xA702)
+        self.assertEqual(identifier.FailedSOPInstanceUIDList, '1.2.826.0.2.1.1.0')
+        self.assertEqual(service._log_transaction.call_args[0][1], 'FAILURE')
+    
+    def test_search_matches_uid_list(self):
+        """Test C-GET matches a multi-valued SOP Instance UID with one IN clause."""
+        import types
+        from dicom_server.handlers.c_get_handler import _search_dicom_storage
+        
+        query_ds = Dataset()
+        query_ds.SOPInstanceUID = ['1.2.826.0.2.1.1.0', '1.2.826.0.2.1.1.1', '9.9.9']
+        queryset, rt_queryset = _search_dicom_storage(
+            types.SimpleNamespace(config=None), query_ds, 'IMAGE'
+        )
+        
+        self.assertIn(' IN ', str(queryset.query))
+        self.assertEqual(
+            sorted(uid for _, uid in queryset),
+            ['1.2.826.0.2.1.1.0', '1.2.826.0.2.1.1.1']
+        )
+    
+    def test_search_blank_uid_list_is_universal(self):
+        """Test a UID list of blank values matches every instance instead of none."""
+        import types
+        from dicom_server.handlers.c_get_handler import _search_dicom_storage
+        
+        query_ds = Dataset()
+        query_ds.SeriesInstanceUID = ['', '']
+        queryset, _ = _search_dicom_storage(
+            types.SimpleNamespace(config=None), query_ds, 'SERIES'
+        )
+        
+        self.assertEqual(queryset.count(), 2)
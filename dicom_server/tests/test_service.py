@@ -6,6 +6,7 @@ from django.test import TestCase
 from dicom_server.models import DicomServerConfig, DicomServiceStatus
 from dicom_server.dicom_scp_service import DicomSCPService
 from dicom_handler.models import SystemConfiguration
+from unittest import mock
 import tempfile
 import time
 import threading
@@ -94,6 +95,149 @@ class DicomSCPServiceTestCase(TestCase):
         
         # Check it stopped
         self.assertFalse(service.is_running)
+    
+    @mock.patch('dicom_server.tasks.update_remote_node_connection_async.delay')
+    def test_calling_ae_validation_uses_cached_titles(self, mock_delay):
+        """Test calling AE validation follows RemoteDicomNode changes."""
+        from dicom_server.models import RemoteDicomNode
+        
+        service = DicomSCPService()
+        service.config = self.config
+        
+        self.assertFalse(service._validate_calling_ae('REMOTE_SCU'))
+        
+        node = RemoteDicomNode.objects.create(
+            name='Remote SCU',
+            allow_incoming=True,
+            incoming_ae_title='REMOTE_SCU'
+        )
+        self.assertTrue(service._validate_calling_ae('REMOTE_SCU'))
+        
+        node.is_active = False
+        node.save()
+        self.assertFalse(service._validate_calling_ae('REMOTE_SCU'))
+    
+    @mock.patch('dicom_server.tasks.update_remote_node_connection_async.delay')
+    def test_calling_ae_validation_expires_cached_titles(self, mock_delay):
+        """Test AE title changes made outside this process are picked up after expiry."""
+        from dicom_server.models import RemoteDicomNode
+        from dicom_server.dicom_scp_service import CONFIG_CACHE_TTL
+        
+        node = RemoteDicomNode.objects.create(
+            name='Remote SCU',
+            allow_incoming=True,
+            incoming_ae_title='REMOTE_SCU'
+        )
+        service = DicomSCPService()
+        service.config = self.config
+        self.assertTrue(service._validate_calling_ae('REMOTE_SCU'))
+        
+        # Queryset update/bulk_create send no signals, like a change saved by
+        # another worker process never reaches this process's receivers
+        RemoteDicomNode.objects.filter(pk=node.pk).update(is_active=False)
+        RemoteDicomNode.objects.bulk_create([
+            RemoteDicomNode(name='New SCU', allow_incoming=True, incoming_ae_title='NEW_SCU')
+        ])
+        
+        expired = time.monotonic() + CONFIG_CACHE_TTL + 1
+        with mock.patch('dicom_server.dicom_scp_service.time.monotonic', return_value=expired):
+            self.assertFalse(service._validate_calling_ae('REMOTE_SCU'))
+            self.assertTrue(service._validate_calling_ae('NEW_SCU'))
+    
+    def test_post_store_backlog_is_bounded(self):
+        """Test post-store submissions wait while the backlog is full."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with mock.patch('dicom_server.dicom_scp_service.POST_STORE_MAX_PENDING', 1):
+            service = DicomSCPService()
+        executor = ThreadPoolExecutor(max_workers=1)
+        service._post_store_executors = [executor]
+        
+        release = threading.Event()
+        service.submit_post_store(release.wait, key='REMOTE_SCU')
+        
+        queued = threading.Event()
+        submitter = threading.Thread(
+            target=lambda: (service.submit_post_store(int, key='REMOTE_SCU'), queued.set()),
+            daemon=True
+        )
+        submitter.start()
+        
+        self.assertFalse(queued.wait(0.2))
+        release.set()
+        self.assertTrue(queued.wait(5))
+        executor.shutdown(wait=True)
+    
+    @mock.patch('dicom_server.tasks.log_dicom_transactions_bulk_async.delay')
+    def test_stop_sends_queued_transactions(self, mock_delay):
+        """Test transaction rows queued after the drain thread exits are sent on stop."""
+        service = DicomSCPService()
+        service._is_running = True
+        service.service_status = DicomServiceStatus.objects.create(pk=1)
+        service.config = self.config
+        
+        service._txn_queue.put_nowait({'transaction_type': 'C-ECHO'})
+        service._txn_queue.put_nowait({'transaction_type': 'C-STORE'})
+        
+        self.assertTrue(service.stop())
+        mock_delay.assert_called_once_with(
+            [{'transaction_type': 'C-ECHO'}, {'transaction_type': 'C-STORE'}]
+        )
+        self.assertTrue(service._txn_queue.empty())
+    
+    def test_initialize_leaves_cached_config_unmodified(self):
+        """Test the storage root is kept on the service, not on the shared cached config."""
+        from dicom_server.dicom_scp_service import get_cached_server_config
+        
+        service = DicomSCPService()
+        self.assertTrue(service.initialize())
+        
+        self.assertEqual(service.storage_root, self.temp_dir)
+        self.assertIs(service.config, get_cached_server_config())
+        self.assertNotIn('storage_root_path', vars(service.config))
+    
+    def test_post_store_failures_are_logged(self):
+        """Test an exception in queued post-store work is logged, not lost."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        service = DicomSCPService()
+        executor = ThreadPoolExecutor(max_workers=1)
+        service._post_store_executors = [executor]
+        
+        def fail(calling_ae):
+            raise RuntimeError('broker unavailable')
+        
+        with self.assertLogs('dicom_server.dicom_scp_service', level='ERROR') as logs:
+            service.submit_post_store(fail, 'REMOTE_SCU', key='REMOTE_SCU').result()
+            executor.shutdown(wait=True)
+        
+        self.assertIn('broker unavailable', '\n'.join(logs.output))
+    
+    def test_stop_shuts_down_server(self):
+        """Test stop() shuts down the service's own server without the AE's server list."""
+        service = DicomSCPService()
+        self.assertTrue(service.start())
+        server = service._server
+        self.assertEqual(service.ae._servers, [])
+        
+        self.assertTrue(service.stop())
+        self.assertIsNone(service._server)
+        self.assertEqual(server.socket.fileno(), -1)
+        self.assertFalse(service.server_thread.is_alive())
+    
+    def test_remote_ip_validation(self):
+        """Test remote IP validation against addresses and CIDR ranges."""
+        self.config.require_ip_validation = True
+        self.config.allowed_ip_addresses = '10.0.0.1, 192.168.1.0/24'
+        
+        service = DicomSCPService()
+        service.config = self.config
+        service._allowed_networks = service._parse_allowed_networks()
+        
+        self.assertTrue(service._validate_remote_ip('10.0.0.1'))
+        self.assertTrue(service._validate_remote_ip('192.168.1.42'))
+        self.assertFalse(service._validate_remote_ip('110.0.0.1'))
+        self.assertFalse(service._validate_remote_ip('192.168.2.1'))
 
 
 class ServiceManagerTestCase(TestCase):
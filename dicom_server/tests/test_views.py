@@ -89,6 +89,18 @@ class ConfigurationViewTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'DICOM Server Configuration')
     
+    def test_config_page_reflects_saved_changes(self):
+        """Test cached form sections are refreshed after the config is saved."""
+        self.client.login(username='testuser', password='testpass123')
+        self.client.get(reverse('dicom_server:config'))
+        
+        config, _ = DicomServerConfig.objects.get_or_create(pk=1)
+        config.ae_title = 'CACHED_AE'
+        config.save()
+        
+        response = self.client.get(reverse('dicom_server:config'))
+        self.assertContains(response, 'CACHED_AE')
+    
     def test_config_update(self):
         """Test updating configuration via POST."""
         self.client.login(username='testuser', password='testpass123')
@@ -312,3 +324,34 @@ class ServiceStatusAPITestCase(TestCase):
         
         data = response.json()
         self.assertIn('is_running', data)
+
+
+class RemoteNodeViewsTestCase(TestCase):
+    """Test remote DICOM node management views."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+    
+    def test_add_node_reports_all_missing_fields(self):
+        """Test every missing Query/Retrieve field is reported in one submit."""
+        self.client.login(username='testuser', password='testpass123')
+        
+        response = self.client.post(reverse('dicom_server:remote_node_add'), {
+            'name': 'Test PACS',
+            'allow_incoming': 'on',
+            'supports_c_find': 'on',
+            'query_retrieve_model': 'STUDY',
+            'timeout': 30,
+            'max_pdu_size': 16384,
+            'fallback_export_destination_priority': 1,
+        })
+        
+        self.assertEqual(response.status_code, 200)
+        form = response.context['form']
+        for field in ('incoming_ae_title', 'host', 'port', 'outgoing_ae_title'):
+            self.assertIn(field, form.errors)